@@ -683,7 +683,10 @@ _提示：如需启用架构检测，请在项目根目录创建 `.vibekit.yaml`
                     section += f"- `{func['name']}` ({func['module']}) - {func['file']}:{func['line']}\n"
                 section += f"\n**代码特征**：\n"
                 section += f"- 长度：{dup['lines']} 行\n"
-                section += f"- 复杂度：{dup['complexity']}\n\n"
+                section += f"- 复杂度：{dup['complexity']}\n"
+                if 'similarity' in dup:
+                    section += f"- 相似度：{dup['similarity']:.0%}（近似重复）\n"
+                section += "\n"
                 section += "**建议**：\n"
                 section += "- 提取为公共函数\n"
                 section += "- 考虑使用模板方法模式\n"
@@ -8,42 +8,142 @@ VibeKit - complexity_analyzer.py
 - 圈复杂度分析（Cyclomatic Complexity）
 - 认知复杂度分析（Cognitive Complexity）
 - 函数长度分析
-- 重复代码检测
+- 重复代码检测（完全重复 + MinHash 近似重复）
+- 文件级分析缓存（.vibekit/cache/complexity/，按文件内容哈希）
 
 使用：
     analyzer = ComplexityAnalyzer(project_path, modules)
     results = analyzer.analyze()
 """
 
+import os
 import ast
+import io
+import re
+import sys
+import json
+import mmap
+import zlib
+import bisect
 import hashlib
+import keyword
+import tokenize
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
-from collections import defaultdict
+from typing import Dict, List, Tuple, Set, Optional, Sequence, Iterator
+from itertools import repeat
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# 缓存格式版本：修改复杂度规则、哈希算法或函数信息结构时递增，使旧缓存失效
+CACHE_VERSION = 7
+
+# 未命中缓存的文件数达到该值时，使用多进程并行解析（CPU 密集）
+_PARALLEL_MIN_FILES = 32
+
+# 进程内结果缓存：(路径, mtime_ns, 文件大小) → 函数列表（只含内容相关字段）
+# 常驻进程（如 watcher）重复分析时，未修改的文件只需一次 stat，无需读取和哈希
+_MEMORY_CACHE: "OrderedDict[Tuple[str, int, int], List[Dict]]" = OrderedDict()
+_MEMORY_CACHE_SIZE = 4096
+
+# 进程内指纹缓存：函数源码的 sha256 摘要 → (归一化哈希, MinHash 签名)
+# 只保留摘要而不保留源码本身，相同函数体跨文件只做一次 token 化
+_FINGERPRINT_CACHE: "OrderedDict[bytes, Tuple[Optional[str], Optional[Tuple[int, ...]]]]" = OrderedDict()
+_FINGERPRINT_CACHE_SIZE = 8192
+
+# 缓存键盐值：缓存版本 + Python 版本（不同版本的 AST 可能不同）
+_CACHE_SALT = f"{CACHE_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}:".encode()
+
+_NEWLINE_RE = re.compile(b'\n')
+
+# 文件度量：空行 / 注释行（行首空白后以 # 开头），由正则引擎在 C 层扫描
+_BLANK_LINE_RE = re.compile(rb'(?m)^[ \t\r\f\v]*$')
+_COMMENT_LINE_RE = re.compile(rb'(?m)^[ \t\r\f\v]*#')
+
+# 决策点节点类型 → 复杂度权重（ast.BoolOp 按操作数个数单独处理）
+_NODE_WEIGHTS = {
+    ast.If: 1,
+    ast.For: 1,
+    ast.While: 1,
+    ast.ExceptHandler: 1,
+    ast.Assert: 1,
+    ast.ListComp: 1,
+    ast.DictComp: 1,
+    ast.SetComp: 1,
+    ast.GeneratorExp: 1,
+}
+
+# 复杂度 / 函数长度分档：值 <= 阈值[i] 落入第 i 档，超过所有阈值落入最后一档
+_COMPLEXITY_BINS = (5, 10, 20)
+_COMPLEXITY_LABELS = (("简单", "✅"), ("中等", "⚠️"), ("复杂", "⚠️"), ("极复杂", "❌"))
+_LENGTH_BINS = (20, 50, 100)
+_LENGTH_LABELS = (("短", "✅"), ("适中", "✅"), ("较长", "⚠️"), ("过长", "❌"))
+
+# 遍历源码时跳过的目录（依赖、虚拟环境、构建产物）；以 . 开头的目录同样跳过
+_SKIPPED_DIRS = frozenset({
+    '__pycache__', 'node_modules', 'venv', 'dist', 'build'
+})
+
+# 计算哈希前删除的空白字符（token 化失败时的退化归一化）
+_WHITESPACE_BYTES = b" \t\n\r\x0b\x0c"
+
+# 归一化时丢弃的 token：注释、换行、缩进等与语义无关的部分
+_IGNORED_TOKENS = frozenset({
+    tokenize.ENCODING, tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+    tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER
+})
+
+# 出现在这些 token 之后的字符串位于语句开头（可能是 docstring）
+_STATEMENT_START_TOKENS = frozenset({tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT})
+
+# 近似重复检测参数
+_SHINGLE_SIZE = 32              # 滑动窗口 token 数
+_ROLLING_BASE = 60013           # Rabin-Karp 滚动哈希底数
+_ROLLING_MOD = 10**18 + 3       # Rabin-Karp 滚动哈希模数
+_MINHASH_SIZE = 64              # MinHash 签名长度（分桶数）
+_MINHASH_BIN_SHIFT = 58         # 64 位哈希的高 6 位选桶，其余 58 位作为桶内取最小的值
+_MINHASH_VALUE_MASK = (1 << _MINHASH_BIN_SHIFT) - 1
+_MINHASH_MASK = (1 << 64) - 1
+_MINHASH_MULTIPLIER = 0x9E3779B97F4A7C15  # shingle 混合用的奇数乘子（黄金分割常数）
+_LSH_BANDS = 8                  # LSH 分段数（64 = 8 段 × 8 行，阈值约 0.77）
+_NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# 参与重复检测的最少逻辑行数（含 def 行，不含 docstring）；更短的桩函数、getter 不计入
+_MIN_DUPLICATE_LOGICAL_LINES = 5
 
 
 class ComplexityAnalyzer:
     """代码复杂度分析器"""
 
-    def __init__(self, project_path: Path, modules: List[Dict]):
+    def __init__(self, project_path: Path, modules: List[Dict], cache_dir: Optional[Path] = None):
         self.project_path = project_path
         self.modules = modules
         self.high_complexity_functions = []
         self.long_functions = []
         self.duplicates = []
 
+        # 按文件内容哈希缓存函数分析结果，未修改的文件跳过 AST 解析
+        self.cache_dir = cache_dir or project_path / ".vibekit" / "cache" / "complexity"
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     def analyze(self) -> Dict:
         """分析代码复杂度"""
         print("📐 分析代码复杂度...")
 
         all_functions = []
+        pending = []  # 未命中缓存、待解析的文件：(py_file, module_name, digest)
 
-        # 遍历所有模块
+        # 遍历所有模块（命中缓存的文件直接加载）
         for module in self.modules:
             module_path = self.project_path / module['path']
-            functions = self._analyze_module(module_path, module['name'])
+            functions = self._analyze_module(module_path, module['name'], pending)
             all_functions.extend(functions)
 
+        # 解析未命中缓存的文件
+        all_functions.extend(self._analyze_pending(pending))
+
         # 1. 找出高复杂度函数
         self.high_complexity_functions = [
             f for f in all_functions if f['complexity'] > 10
@@ -54,8 +154,16 @@ class ComplexityAnalyzer:
             f for f in all_functions if f['lines'] > 50
         ]
 
-        # 3. 检测重复代码
+        # 只为需要输出的函数补充源码
+        self._attach_sources(self.high_complexity_functions + self.long_functions)
+
+        # 3. 检测重复代码（完全重复 + 近似重复）
         self.duplicates = self._detect_duplicates(all_functions)
+        self.duplicates.extend(self._detect_near_duplicates(all_functions))
+
+        # MinHash 签名只用于检测，不写入结果
+        for func in all_functions:
+            func.pop('minhash', None)
 
         # 统计
         total_functions = len(all_functions)
@@ -63,6 +171,7 @@ class ComplexityAnalyzer:
         avg_length = sum(f['lines'] for f in all_functions) / total_functions if total_functions > 0 else 0
 
         print(f"   分析了 {total_functions} 个函数")
+        print(f"   缓存：命中 {self.cache_hits} 个文件，未命中 {self.cache_misses} 个文件")
         print(f"   平均复杂度：{avg_complexity:.1f}")
         print(f"   平均长度：{avg_length:.1f} 行")
 
@@ -91,149 +200,586 @@ class ComplexityAnalyzer:
             'duplicates': self.duplicates
         }
 
-    def _analyze_module(self, module_path: Path, module_name: str) -> List[Dict]:
-        """分析模块内的所有函数"""
+    def _analyze_module(self, module_path: Path, module_name: str, pending: List[Tuple]) -> List[Dict]:
+        """加载模块内命中缓存的文件，未命中的文件加入 pending 待解析
+
+        缓存查找顺序：进程内缓存（按 stat）→ 磁盘缓存（按内容哈希）。
+        """
         functions = []
 
-        for py_file in module_path.rglob("*.py"):
+        for py_file in _iter_py_files(module_path):
             try:
-                with open(py_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                st = py_file.stat()
+                stat_key = (str(py_file), st.st_mtime_ns, st.st_size)
+
+                entries = _memory_cache_get(stat_key)
+                if entries is None:
+                    # mmap 只读映射：计算哈希时文件内容不会被复制进 Python 对象
+                    with open(py_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        digest = _content_digest(data)
+            except Exception as e:
+                # 跳过无法读取的文件（空文件无法 mmap，同样跳过）
+                continue
 
-                # 解析 AST
-                tree = ast.parse(content)
+            if entries is None:
+                # 命中磁盘缓存：直接加载，跳过解析
+                entries = self._load_cache(digest)
+                if entries is None:
+                    pending.append((py_file, module_name, digest, stat_key))
+                    continue
+                _memory_cache_put(stat_key, entries)
 
-                # 分析函数
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.FunctionDef):
-                        func_info = self._analyze_function(node, py_file, module_name, content)
-                        if func_info:
-                            functions.append(func_info)
+            self.cache_hits += 1
+            rel_file = str(py_file.relative_to(self.project_path))
+            functions.extend(
+                dict(entry, module=module_name, file=rel_file) for entry in entries
+            )
 
-            except Exception as e:
+        return functions
+
+    def _analyze_pending(self, pending: List[Tuple]) -> List[Dict]:
+        """解析未命中缓存的文件并写入缓存
+
+        AST 解析是 CPU 密集型工作，文件较多时分发到多个进程并行执行；
+        无法创建子进程时退回串行。
+        """
+        paths = [item[0] for item in pending]
+        module_names = [item[1] for item in pending]
+
+        results = None
+        if len(pending) >= _PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1:
+            try:
+                with ProcessPoolExecutor() as executor:
+                    results = list(executor.map(
+                        _analyze_path, paths, repeat(self.project_path), module_names, chunksize=8
+                    ))
+            except (OSError, BrokenProcessPool):
+                results = None
+
+        if results is None:
+            results = list(map(_analyze_path, paths, repeat(self.project_path), module_names))
+
+        functions = []
+        for (py_file, module_name, digest, stat_key), result in zip(pending, results):
+            if result is None:
                 # 跳过无法解析的文件
                 continue
+            # 缓存键使用解析时实际读到的内容的哈希
+            parsed_digest, file_functions = result
+            self.cache_misses += 1
+            entries = _content_fields(file_functions)
+            self._save_cache(parsed_digest, entries)
+            if parsed_digest == digest:
+                # 文件在 stat 之后被修改过时，stat 键对应的已不是这份内容，不写入进程内缓存
+                _memory_cache_put(stat_key, entries)
+            functions.extend(file_functions)
 
         return functions
 
-    def _analyze_function(self, node: ast.FunctionDef, file_path: Path, module_name: str, content: str) -> Dict:
-        """分析单个函数"""
-        # 计算圈复杂度
-        complexity = self._calculate_complexity(node)
-
-        # 计算函数长度
-        lines = self._calculate_lines(node)
+    def _attach_sources(self, functions: List[Dict]):
+        """为需要输出的函数补充源码
 
-        # 获取函数源码
-        source_lines = content.split('\n')
-        func_source = '\n'.join(source_lines[node.lineno - 1:node.end_lineno])
-
-        # 计算函数签名哈希（用于重复检测）
-        func_hash = self._calculate_hash(func_source)
+        分析阶段只记录哈希等元数据，不保留源码；这里按文件分组，每个文件只读取一次。
+        相同的函数源码只保留一份字符串（归一化哈希相同的源码不一定逐字相同，因此按源码本身去重）。
+        """
+        by_file = defaultdict(list)
+        for func in functions:
+            if 'source' not in func:
+                by_file[func['file']].append(func)
 
-        return {
-            'name': node.name,
-            'module': module_name,
-            'file': str(file_path.relative_to(self.project_path)),
-            'line': node.lineno,
-            'complexity': complexity,
-            'lines': lines,
-            'source': func_source,
-            'hash': func_hash
-        }
+        interned_sources = {}
+        for rel_file, funcs in by_file.items():
+            try:
+                data = (self.project_path / rel_file).read_bytes()
+            except OSError:
+                data = b''
+            line_offsets = _line_offsets(data)
+
+            for func in funcs:
+                source = _extract_source(data, line_offsets, func['line'], func['line'] + func['lines'] - 1)
+                source = source.decode('utf-8', 'replace')
+                func['source'] = interned_sources.setdefault(source, source)
+
+    def _load_cache(self, digest: str) -> Optional[List[Dict]]:
+        """读取文件级缓存（不存在或已损坏时返回 None）"""
+        try:
+            return json.loads((self.cache_dir / f"{digest}.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
 
-    def _calculate_complexity(self, node: ast.FunctionDef) -> int:
-        """计算圈复杂度（简化版）
+    def _save_cache(self, digest: str, entries: List[Dict]):
+        """原子写入文件级缓存
 
-        圈复杂度 = 决策点数量 + 1
-        决策点：if, elif, for, while, except, and, or, assert
+        缓存只保存与文件内容相关的字段，module / file 在加载时按实际路径补齐，
+        因此内容相同的文件可以共享同一条缓存。
         """
-        complexity = 1  # 基础复杂度
-
-        for child in ast.walk(node):
-            # if 语句
-            if isinstance(child, ast.If):
-                complexity += 1
-            # for/while 循环
-            elif isinstance(child, (ast.For, ast.While)):
-                complexity += 1
-            # except 语句
-            elif isinstance(child, ast.ExceptHandler):
-                complexity += 1
-            # 布尔运算符 (and, or)
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
-            # 列表/字典/集合推导式
-            elif isinstance(child, (ast.ListComp, ast.DictComp, ast.SetComp, ast.GeneratorExp)):
-                complexity += 1
-            # assert 语句
-            elif isinstance(child, ast.Assert):
-                complexity += 1
-
-        return complexity
-
-    def _calculate_lines(self, node: ast.FunctionDef) -> int:
-        """计算函数行数"""
-        if node.end_lineno and node.lineno:
-            return node.end_lineno - node.lineno + 1
-        return 0
-
-    def _calculate_hash(self, source: str) -> str:
-        """计算源码哈希（归一化后）"""
-        # 简单归一化：移除空白符、注释
-        normalized = ''.join(source.split())
-        return hashlib.md5(normalized.encode()).hexdigest()[:8]
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.cache_dir / f"{digest}.json"
+            tmp_file = cache_file.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(entries, ensure_ascii=False), encoding='utf-8')
+            tmp_file.replace(cache_file)
+        except OSError:
+            # 缓存写入失败不影响分析结果
+            pass
 
     def _detect_duplicates(self, functions: List[Dict]) -> List[Dict]:
         """检测重复代码
 
         简单策略：
-        1. 基于哈希值分组
-        2. 相同哈希值的函数视为重复
-        3. 只保留出现 >= 2 次的
+        1. 基于 (哈希值, 行数, 复杂度) 分组，哈希冲突但结构不同的函数不会落入同一组
+        2. 只保留出现 >= 2 次的
         """
         duplicates = []
 
-        # 按哈希值分组
+        # 按 (哈希值, 行数, 复杂度) 分组
         hash_groups = defaultdict(list)
         for func in functions:
-            hash_groups[func['hash']].append(func)
+            if func['hash'] is None:
+                continue
+            hash_groups[(func['hash'], func['lines'], func['complexity'])].append(func)
 
         # 找出重复的组
-        for func_hash, group in hash_groups.items():
+        for group in hash_groups.values():
             if len(group) >= 2:
-                # 检查是否真的重复（不只是哈希冲突）
-                # 简单检查：行数和复杂度相同
-                if self._is_duplicate_group(group):
-                    duplicates.append({
-                        'count': len(group),
-                        'functions': [
-                            {
-                                'name': f['name'],
-                                'module': f['module'],
-                                'file': f['file'],
-                                'line': f['line']
-                            }
-                            for f in group
-                        ],
-                        'lines': group[0]['lines'],
-                        'complexity': group[0]['complexity']
-                    })
+                duplicates.append({
+                    'count': len(group),
+                    'functions': [
+                        {
+                            'name': f['name'],
+                            'module': f['module'],
+                            'file': f['file'],
+                            'line': f['line']
+                        }
+                        for f in group
+                    ],
+                    'lines': group[0]['lines'],
+                    'complexity': group[0]['complexity']
+                })
 
         return duplicates
 
-    def _is_duplicate_group(self, group: List[Dict]) -> bool:
-        """判断是否是真正的重复组"""
-        if len(group) < 2:
-            return False
+    def _detect_near_duplicates(self, functions: List[Dict]) -> List[Dict]:
+        """检测近似重复代码（MinHash + LSH）
+
+        策略：
+        1. 归一化哈希相同的函数合并为一类（完全重复已由 _detect_duplicates 报告）
+        2. 按 band 切分 MinHash 签名分桶，同桶的两类成为候选对
+        3. 候选对的估计 Jaccard 相似度 >= 阈值时合并为同一组
+        """
+        classes = defaultdict(list)
+        for func in functions:
+            if func.get('minhash'):
+                classes[func['hash']].append(func)
+
+        hashes = list(classes)
+        signatures = [classes[h][0]['minhash'] for h in hashes]
+
+        # LSH 分桶
+        rows = _MINHASH_SIZE // _LSH_BANDS
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            for band in range(_LSH_BANDS):
+                buckets[(band, tuple(signature[band * rows:(band + 1) * rows]))].append(i)
+
+        # 并查集合并相似类
+        parent = list(range(len(hashes)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        similar_pairs = []
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    similarity = _estimate_jaccard(signatures[i], signatures[j])
+                    if similarity >= _NEAR_DUPLICATE_THRESHOLD:
+                        similar_pairs.append((i, similarity))
+                        root_i, root_j = find(i), find(j)
+                        if root_i != root_j:
+                            parent[root_j] = root_i
+
+        group_similarity = {}
+        for i, similarity in similar_pairs:
+            root = find(i)
+            group_similarity[root] = min(group_similarity.get(root, 1.0), similarity)
+
+        groups = defaultdict(list)
+        for i, func_hash in enumerate(hashes):
+            root = find(i)
+            if root in group_similarity:
+                groups[root].extend(classes[func_hash])
+
+        return [
+            {
+                'count': len(group),
+                'functions': [
+                    {
+                        'name': f['name'],
+                        'module': f['module'],
+                        'file': f['file'],
+                        'line': f['line']
+                    }
+                    for f in group
+                ],
+                'lines': group[0]['lines'],
+                'complexity': group[0]['complexity'],
+                'similarity': round(group_similarity[root], 2)
+            }
+            for root, group in groups.items()
+        ]
+
+
+class _FileVisitor:
+    """单次遍历文件 AST，同时收集函数并计算圈复杂度（简化版）
+
+    圈复杂度 = 决策点数量 + 1
+    决策点：if, elif, for, while, except, and, or, assert, 推导式
+
+    用显式队列迭代遍历（不递归、不经过 ast.walk 生成器），每个节点只访问一次；
+    每个函数体作为一个作用域入队，嵌套函数的决策点在遍历结束后累加到外层函数，
+    即外层函数的复杂度统计其整个子树（含嵌套函数）的决策点。
+    """
+
+    def __init__(self):
+        # 函数信息，按作用域出队顺序登记：先是模块顶层（含类中）的函数，再依次是各函数体内的
+        # 嵌套函数；同一作用域内按广度优先。外层函数总在其嵌套函数之前
+        self.functions = []
+
+    def visit(self, tree: ast.AST):
+        functions = self.functions
+        parents = []  # parents[i]：functions[i] 的外层函数下标（顶层为 None）
+
+        # 局部变量绑定，减少热循环中的属性查找
+        weights = _NODE_WEIGHTS
+        iter_child_nodes = ast.iter_child_nodes
+        function_def = ast.FunctionDef
+        bool_op = ast.BoolOp
+
+        # 每个函数体作为一个作用域单独遍历：(作用域根节点, 所属函数下标)
+        scopes = deque([(tree, None)])
+        while scopes:
+            root, owner = scopes.popleft()
+            complexity = 0
+
+            nodes = deque(iter_child_nodes(root))
+            pop, extend = nodes.popleft, nodes.extend
+            while nodes:
+                node = pop()
+                node_type = type(node)
+
+                if node_type is function_def:
+                    parents.append(owner)
+                    scopes.append((node, len(functions)))
+                    functions.append({
+                        'name': node.name,
+                        'lineno': node.lineno,
+                        'end_lineno': node.end_lineno,
+                        'complexity': 1  # 基础复杂度
+                    })
+                    continue
+
+                # AST 节点类型没有继承层次，按 type() 查表代替逐个 isinstance
+                weight = weights.get(node_type)
+                if weight is not None:
+                    complexity += weight
+                elif node_type is bool_op:
+                    # 布尔运算符 (and, or)：+ 操作数个数 - 1
+                    complexity += len(node.values) - 1
+
+                extend(iter_child_nodes(node))
+
+            if owner is not None:
+                functions[owner]['complexity'] += complexity
+
+        # 内层函数总在外层函数之后登记，倒序即可自内向外累加
+        for i in range(len(functions) - 1, -1, -1):
+            if parents[i] is not None:
+                functions[parents[i]]['complexity'] += functions[i]['complexity'] - 1
 
-        # 检查行数和复杂度是否相同
-        first = group[0]
-        for func in group[1:]:
-            if func['lines'] != first['lines'] or func['complexity'] != first['complexity']:
-                return False
 
-        return True
+def _content_fields(functions: List[Dict]) -> List[Dict]:
+    """去掉与路径相关的字段（module / file），得到可缓存的函数信息"""
+    return [
+        {k: v for k, v in f.items() if k not in ('module', 'file')}
+        for f in functions
+    ]
+
+
+def _memory_cache_get(key: Tuple[str, int, int]) -> Optional[List[Dict]]:
+    """查询进程内缓存（LRU）"""
+    entries = _MEMORY_CACHE.get(key)
+    if entries is not None:
+        _MEMORY_CACHE.move_to_end(key)
+    return entries
+
+
+def _memory_cache_put(key: Tuple[str, int, int], entries: List[Dict]):
+    """写入进程内缓存，超出容量时淘汰最久未使用的条目"""
+    _MEMORY_CACHE[key] = entries
+    _MEMORY_CACHE.move_to_end(key)
+    if len(_MEMORY_CACHE) > _MEMORY_CACHE_SIZE:
+        _MEMORY_CACHE.popitem(last=False)
+
+
+def _content_digest(data) -> str:
+    """文件内容的缓存键（内容哈希，加盐区分缓存版本和 Python 版本）"""
+    hasher = hashlib.sha256(_CACHE_SALT)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _analyze_path(py_file: Path, project_path: Path, module_name: str) -> Optional[Tuple[str, List[Dict]]]:
+    """解析单个文件并分析其中所有函数（可在子进程中执行）
+
+    返回 (内容哈希, 函数列表)：哈希按实际解析的字节计算，文件在查缓存之后
+    被修改也不会把新内容的结果存到旧哈希下。无法读取或解析时返回 None。
+    """
+    try:
+        data = py_file.read_bytes()
+        digest = _content_digest(data)
+
+        # 解析 AST（直接解析字节，由 ast 按编码声明解码）
+        tree = ast.parse(data, filename=str(py_file))
+
+        # 单次遍历收集函数及其复杂度
+        visitor = _FileVisitor()
+        visitor.visit(tree)
+
+        # 每个文件只计算一次行偏移表和相对路径，供各函数复用
+        line_offsets = _line_offsets(data)
+        rel_file = str(py_file.relative_to(project_path))
+
+        # 分析函数
+        return digest, [
+            _analyze_function(func, rel_file, module_name, data, line_offsets)
+            for func in visitor.functions
+        ]
+    except Exception:
+        # 任何一个文件出错都只跳过该文件，不中断整次分析（并行时异常会从 executor.map 抛出）
+        return None
+
+
+def _analyze_function(func: Dict, rel_file: str, module_name: str,
+                      data: bytes, line_offsets: List[int]) -> Dict:
+    """分析单个函数（复杂度已由 _FileVisitor 计算）"""
+    # 计算函数长度
+    lines = _calculate_lines(func)
+
+    # 截取函数源码（只用于计算指纹，不保存；需要输出时由 _attach_sources 补充）
+    func_source = _extract_source(data, line_offsets, func['lineno'], func['end_lineno'])
+
+    # 计算函数签名哈希（用于重复检测）和 MinHash 签名（用于近似重复检测）
+    func_hash, func_minhash = _fingerprint(func_source)
+
+    return {
+        'name': func['name'],
+        'module': module_name,
+        'file': rel_file,
+        'line': func['lineno'],
+        'complexity': func['complexity'],
+        'lines': lines,
+        'hash': func_hash,
+        'minhash': func_minhash
+    }
+
+
+def _calculate_lines(func: Dict) -> int:
+    """计算函数行数"""
+    if func['end_lineno'] and func['lineno']:
+        return func['end_lineno'] - func['lineno'] + 1
+    return 0
+
+
+def _fingerprint(source: bytes) -> Tuple[Optional[str], Optional[Tuple[int, ...]]]:
+    """计算函数源码的归一化哈希和 MinHash 签名（按源码的 sha256 摘要记忆化）
+
+    相同的函数体（跨文件或重复调用 analyze()）只做一次 token 化和哈希。
+    """
+    key = hashlib.sha256(source).digest()
+    result = _FINGERPRINT_CACHE.get(key)
+    if result is not None:
+        _FINGERPRINT_CACHE.move_to_end(key)
+        return result
+
+    result = _compute_fingerprint(source)
+    _FINGERPRINT_CACHE[key] = result
+    if len(_FINGERPRINT_CACHE) > _FINGERPRINT_CACHE_SIZE:
+        _FINGERPRINT_CACHE.popitem(last=False)
+    return result
+
+
+def _compute_fingerprint(source: bytes) -> Tuple[Optional[str], Optional[Tuple[int, ...]]]:
+    """计算函数源码的归一化哈希和 MinHash 签名
+
+    函数过短（不足一个滑动窗口）或无法 token 化时签名为 None；
+    逻辑行数不足 _MIN_DUPLICATE_LOGICAL_LINES 时哈希也为 None，不参与重复检测。
+    """
+    try:
+        tokens, logical_lines = _normalized_tokens(source)
+    except (tokenize.TokenError, SyntaxError, ValueError):
+        # 无法 token 化时退化为只移除空白符（截取的函数源码不含文件的编码声明，
+        # 非 UTF-8 编码的文件会在解码时抛出 UnicodeDecodeError），按非空行数判断长度
+        if sum(1 for line in source.splitlines() if line.strip()) < _MIN_DUPLICATE_LOGICAL_LINES:
+            return None, None
+        normalized = source.translate(None, _WHITESPACE_BYTES)
+        return hashlib.blake2b(normalized, digest_size=8).hexdigest(), None
+
+    if logical_lines < _MIN_DUPLICATE_LOGICAL_LINES:
+        return None, None
+
+    normalized = '\x1f'.join(tokens).encode('utf-8')
+    func_hash = hashlib.blake2b(normalized, digest_size=8).hexdigest()
+    return func_hash, _minhash_signature(_shingle_hashes(tokens))
+
+
+def _normalized_tokens(source: bytes) -> Tuple[List[str], int]:
+    """将函数源码归一化为 token 序列（用于重复检测），同时统计逻辑行数
+
+    - 丢弃注释、空白、缩进，以及独立成句的字符串（docstring）
+    - 标识符统一替换为 "ID"（关键字保留），仅重命名变量的函数也能识别为重复；
+      def 之后的函数名保留原样，同名不同实现的桩函数不会因此被归为一组
+    - 逻辑行数按 NEWLINE token 计数，独立成句的 docstring 不计入
+    """
+    tokens = []
+    logical_lines = 0
+    pending_strings = []  # 语句开头的字符串，若整句只有字符串则丢弃
+    prev_type = tokenize.NEWLINE
+    prev_string = ''
+
+    for tok in tokenize.tokenize(io.BytesIO(source).readline):
+        tok_type = tok.type
+        if tok_type in (tokenize.COMMENT, tokenize.NL, tokenize.ENCODING):
+            continue
+
+        if tok_type == tokenize.STRING and (pending_strings or prev_type in _STATEMENT_START_TOKENS):
+            pending_strings.append(tok.string)
+            continue
+
+        if pending_strings:
+            if tok_type == tokenize.NEWLINE:
+                # 整句只有字符串（docstring）：丢弃，也不计入逻辑行
+                pending_strings = []
+                continue
+            tokens.extend(pending_strings)
+            pending_strings = []
+
+        if tok_type == tokenize.NEWLINE:
+            logical_lines += 1
+
+        prev_type = tok_type
+        if tok_type in _IGNORED_TOKENS:
+            continue
+
+        if tok_type == tokenize.NAME and prev_string != 'def' and not keyword.iskeyword(tok.string):
+            tokens.append('ID')
+        else:
+            tokens.append(tok.string)
+        prev_string = tok.string
+
+    return tokens, logical_lines
+
+
+def _shingle_hashes(tokens: List[str]) -> Set[int]:
+    """计算 token 序列所有滑动窗口的 Rabin-Karp 滚动哈希
+
+    H(S) = sum(c_i * P^i) mod MOD，窗口每滑动一步 O(1) 更新。
+    token 编码使用 crc32，保证跨进程稳定（可写入缓存）。
+    """
+    if len(tokens) < _SHINGLE_SIZE:
+        return set()
+
+    codes = [zlib.crc32(token.encode('utf-8')) for token in tokens]
+    high = pow(_ROLLING_BASE, _SHINGLE_SIZE - 1, _ROLLING_MOD)
+
+    h = 0
+    for code in codes[:_SHINGLE_SIZE]:
+        h = (h * _ROLLING_BASE + code) % _ROLLING_MOD
+    shingles = {h}
+
+    for i in range(_SHINGLE_SIZE, len(codes)):
+        h = ((h - codes[i - _SHINGLE_SIZE] * high) * _ROLLING_BASE + codes[i]) % _ROLLING_MOD
+        shingles.add(h)
+
+    return shingles
+
+
+def _minhash_signature(shingles: Set[int]) -> Optional[Tuple[int, ...]]:
+    """计算 shingle 集合的 MinHash 签名（空集合返回 None）
+
+    单置换 MinHash（one permutation hashing）：每个 shingle 只哈希一次，
+    按哈希高位分到 64 个桶，各桶取最小值作为签名的一位，代替 64 个独立置换。
+    空桶借用其后第一个非空桶的值（加上距离偏移以区分），使签名各位都可比较。
+    """
+    if not shingles:
+        return None
+
+    mins = [None] * _MINHASH_SIZE
+    for x in shingles:
+        h = (x * _MINHASH_MULTIPLIER) & _MINHASH_MASK
+        b = h >> _MINHASH_BIN_SHIFT
+        v = h & _MINHASH_VALUE_MASK
+        m = mins[b]
+        if m is None or v < m:
+            mins[b] = v
+
+    signature = list(mins)
+    for i in range(_MINHASH_SIZE):
+        if signature[i] is None:
+            j = 1
+            while mins[(i + j) % _MINHASH_SIZE] is None:
+                j += 1
+            signature[i] = mins[(i + j) % _MINHASH_SIZE] + (j << _MINHASH_BIN_SHIFT)
+    return tuple(signature)
+
+
+def _estimate_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """用 MinHash 签名估计 Jaccard 相似度"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def _iter_py_files(root: Path) -> Iterator[Path]:
+    """基于 os.scandir 的迭代遍历，列出目录下所有 .py 文件
+
+    DirEntry 自带文件类型信息，无需为每个条目额外 stat；
+    无关目录在遍历时直接剪枝，不会进入其子树。
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not name.startswith('.') and name not in _SKIPPED_DIRS:
+                            stack.append(entry.path)
+                    elif name.endswith('.py') and entry.is_file():
+                        yield Path(entry.path)
+        except OSError:
+            # 无权限等无法读取的目录直接跳过
+            continue
+
+
+def _line_offsets(data: bytes) -> List[int]:
+    """计算每行起始偏移：第 n 行（从 1 开始）起始于 offsets[n - 1]"""
+    return [0] + [m.end() for m in _NEWLINE_RE.finditer(data)]
+
+
+def _extract_source(data: bytes, line_offsets: List[int], start_line: int, end_line: int) -> bytes:
+    """按行偏移表截取第 start_line ~ end_line 行源码（不含末尾换行）"""
+    if start_line - 1 >= len(line_offsets):
+        # 文件在两次读取之间被截短
+        return b''
+    start = line_offsets[start_line - 1]
+    if end_line < len(line_offsets):
+        end = line_offsets[end_line] - 1
+    else:
+        end = len(data)
+    return data[start:end]
 
 
 class CodeMetrics:
@@ -243,17 +789,16 @@ class CodeMetrics:
     def calculate_file_metrics(file_path: Path) -> Dict:
         """计算文件级别的度量"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            data = file_path.read_bytes()
 
-            lines = content.split('\n')
-            total_lines = len(lines)
+            # 行数与按 '\n' 切分的结果一致（末尾换行后的空行也计入）
+            total_lines = data.count(b'\n') + 1
 
             # 空行
-            blank_lines = sum(1 for line in lines if not line.strip())
+            blank_lines = len(_BLANK_LINE_RE.findall(data))
 
             # 注释行（简化：以 # 开头）
-            comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
+            comment_lines = len(_COMMENT_LINE_RE.findall(data))
 
             # 代码行
             code_lines = total_lines - blank_lines - comment_lines
@@ -278,26 +823,12 @@ class CodeMetrics:
     @staticmethod
     def categorize_complexity(complexity: int) -> Tuple[str, str]:
         """分类复杂度"""
-        if complexity <= 5:
-            return "简单", "✅"
-        elif complexity <= 10:
-            return "中等", "⚠️"
-        elif complexity <= 20:
-            return "复杂", "⚠️"
-        else:
-            return "极复杂", "❌"
+        return _COMPLEXITY_LABELS[bisect.bisect_left(_COMPLEXITY_BINS, complexity)]
 
     @staticmethod
     def categorize_length(lines: int) -> Tuple[str, str]:
         """分类函数长度"""
-        if lines <= 20:
-            return "短", "✅"
-        elif lines <= 50:
-            return "适中", "✅"
-        elif lines <= 100:
-            return "较长", "⚠️"
-        else:
-            return "过长", "❌"
+        return _LENGTH_LABELS[bisect.bisect_left(_LENGTH_BINS, lines)]
 
 
 if __name__ == "__main__":
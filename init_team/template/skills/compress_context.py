@@ -18,17 +18,50 @@ compress_context.py - 上下文压缩
 
 import json
 import sys
+import functools
 from pathlib import Path
 
+# 可选：orjson（C 实现，序列化更快），未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 预览长度（字符）；UTF-8 单字符最多 4 字节，读取上限按此换算
+PREVIEW_CHARS = 500
+PREVIEW_BYTES = PREVIEW_CHARS * 4
+
 
 def load_task(project_root: str, task_id: str) -> dict:
-    """加载任务信息"""
+    """加载任务信息
+
+    解析结果按 (项目根目录, 任务 ID, tasks.md 修改时间) 缓存，
+    同一进程内重复压缩时跳过解析；tasks.md 修改后自动失效。
+    """
     root = Path(project_root).resolve()
     tasks_file = root / "tasks.md"
 
+    try:
+        mtime_ns = tasks_file.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = 0
+
+    task = _parse_task(str(root), task_id, mtime_ns)
+
+    # 返回副本，避免调用方修改缓存中的结果
+    return {
+        "id": task["id"],
+        "context_pointers": dict(task["context_pointers"])
+    }
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_task(root: str, task_id: str, mtime_ns: int) -> dict:
+    """从 tasks.md 解析任务（mtime_ns 仅作为缓存键，为 0 表示文件不存在）"""
     # 简化版：从 tasks.md 中解析任务
     # 实际项目中应该有更完善的任务管理格式
-    if not tasks_file.exists():
+    if not mtime_ns:
         return {
             "id": task_id,
             "context_pointers": {}
@@ -63,16 +96,24 @@ def extract_minimal_context(project_root: str, pointers: dict) -> dict:
             context[key] = {"error": f"文件不存在: {file_path}"}
             continue
 
-        # 读取文件内容（只提取预览）
+        # 只读取文件开头用于预览，文件大小取自 stat，不读取全文
         try:
-            content = full_path.read_text()
-            preview = content[:500] + "..." if len(content) > 500 else content
+            full_size = full_path.stat().st_size
+            with open(full_path, 'rb') as f:
+                head = f.read(PREVIEW_BYTES)
+
+            # 截断处可能切开多字节字符，忽略不完整的尾部字节
+            text = head.decode('utf-8', 'ignore')
+            if len(text) > PREVIEW_CHARS or full_size > len(head):
+                preview = text[:PREVIEW_CHARS] + "..."
+            else:
+                preview = text
 
             context[key] = {
                 "file": file_path,
                 "anchor": anchor,
                 "preview": preview,
-                "full_size": len(content)
+                "full_size": full_size
             }
         except Exception as e:
             context[key] = {"error": str(e)}
@@ -80,6 +121,13 @@ def extract_minimal_context(project_root: str, pointers: dict) -> dict:
     return context
 
 
+def dump_json(data: dict) -> bytes:
+    """序列化为 UTF-8 编码的 JSON（2 空格缩进，保留中文）"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
 def compress_context(project_root: str, task_id: str) -> dict:
     """压缩上下文"""
     task = load_task(project_root, task_id)
@@ -124,7 +172,7 @@ def main():
     output_dir.mkdir(exist_ok=True)
 
     output_file = output_dir / f"compressed_{task_id}.json"
-    output_file.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    output_file.write_bytes(dump_json(result))
 
     print(f"✓ 压缩上下文已生成: {output_file}")
     print(f"  指针数: {result['metadata']['pointer_count']}")
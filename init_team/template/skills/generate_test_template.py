@@ -8,23 +8,23 @@ generate_test_template.py - 生成测试模板
 - 遵循 TDD 最佳实践
 
 使用:
-    python generate_test_template.py <impl_file> [framework]
+    python generate_test_template.py <impl_file> [impl_file ...] [framework]
 
 示例:
     python generate_test_template.py src/auth/api/login.py pytest
     python generate_test_template.py src/user/service/user_service.py unittest
+    python generate_test_template.py src/auth/api/login.py src/auth/api/logout.py
 """
 
 import sys
 from pathlib import Path
+from string import Template
+from typing import List, Set
 
 
-def generate_pytest_template(impl_file: Path) -> str:
-    """生成 pytest 测试模板"""
-    module_name = impl_file.stem
-
-    template = f'''"""
-测试模块: {module_name}
+# 模板在导入时构建一次，每次生成只做变量替换
+PYTEST_TEMPLATE = Template('''"""
+测试模块: ${module_name}
 
 遵循 TDD 原则:
 1. 先写测试 (Red)
@@ -33,11 +33,11 @@ def generate_pytest_template(impl_file: Path) -> str:
 """
 
 import pytest
-from {module_name} import *
+from ${module_name} import *
 
 
-class Test{module_name.capitalize()}:
-    """测试类: {module_name}"""
+class Test${class_name}:
+    """测试类: ${module_name}"""
 
     def setup_method(self):
         """每个测试前执行"""
@@ -57,24 +57,18 @@ class Test{module_name.capitalize()}:
 
         # Assert (断言)
         assert True, "待实现"
-'''
-    return template
-
-
-def generate_unittest_template(impl_file: Path) -> str:
-    """生成 unittest 测试模板"""
-    module_name = impl_file.stem
+''')
 
-    template = f'''"""
-测试模块: {module_name}
+UNITTEST_TEMPLATE = Template('''"""
+测试模块: ${module_name}
 """
 
 import unittest
-from {module_name} import *
+from ${module_name} import *
 
 
-class Test{module_name.capitalize()}(unittest.TestCase):
-    """测试类: {module_name}"""
+class Test${class_name}(unittest.TestCase):
+    """测试类: ${module_name}"""
 
     def setUp(self):
         """每个测试前执行"""
@@ -91,81 +85,121 @@ class Test{module_name.capitalize()}(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
-'''
-    return template
+''')
 
-
-def generate_jest_template(impl_file: Path) -> str:
-    """生成 jest 测试模板 (JavaScript/TypeScript)"""
-    module_name = impl_file.stem
-
-    template = f'''/**
- * 测试模块: {module_name}
+JEST_TEMPLATE = Template('''/**
+ * 测试模块: ${module_name}
  */
 
-import {{}} from './{module_name}';
+import {} from './${module_name}';
 
-describe('{module_name}', () => {{
-  beforeEach(() => {{
+describe('${module_name}', () => {
+  beforeEach(() => {
     // 每个测试前执行
-  }});
+  });
 
-  afterEach(() => {{
+  afterEach(() => {
     // 每个测试后执行
-  }});
+  });
 
-  test('example test', () => {{
+  test('example test', () => {
     // Arrange (准备)
 
     // Act (执行)
 
     // Assert (断言)
     expect(true).toBe(true);
-  }});
-}});
-'''
-    return template
+  });
+});
+''')
+
+
+def generate_pytest_template(impl_file: Path) -> str:
+    """生成 pytest 测试模板"""
+    module_name = impl_file.stem
+    return PYTEST_TEMPLATE.substitute(module_name=module_name, class_name=module_name.capitalize())
+
+
+def generate_unittest_template(impl_file: Path) -> str:
+    """生成 unittest 测试模板"""
+    module_name = impl_file.stem
+    return UNITTEST_TEMPLATE.substitute(module_name=module_name, class_name=module_name.capitalize())
+
+
+def generate_jest_template(impl_file: Path) -> str:
+    """生成 jest 测试模板 (JavaScript/TypeScript)"""
+    return JEST_TEMPLATE.substitute(module_name=impl_file.stem)
+
+
+# 支持的测试框架 → 模板生成函数
+GENERATORS = {
+    "pytest": generate_pytest_template,
+    "unittest": generate_unittest_template,
+    "jest": generate_jest_template,
+}
+
+# 已确认存在的目录：批量生成时同一目录只执行一次 mkdir
+_ENSURED_DIRS: Set[Path] = set()
+
+
+def _ensure_dir(path: Path):
+    """确保目录存在（进程内记忆化）"""
+    if path not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
+def get_test_file(impl_file: Path) -> Path:
+    """根据实现文件计算测试文件路径"""
+    if impl_file.suffix == ".py":
+        return impl_file.parent.parent.parent / "tests" / f"test_{impl_file.name}"
+    if impl_file.suffix in [".js", ".ts"]:
+        return impl_file.parent / f"{impl_file.stem}.test{impl_file.suffix}"
+    raise ValueError(f"不支持的文件类型: {impl_file.suffix}")
+
+
+def generate_test_files(impl_files: List[Path], framework: str = "pytest") -> List[Path]:
+    """批量生成测试模板，返回生成的测试文件路径"""
+    if framework not in GENERATORS:
+        raise ValueError(f"不支持的框架: {framework}")
+
+    generate = GENERATORS[framework]
+    test_files = []
+
+    for impl_file in impl_files:
+        test_file = get_test_file(impl_file)
+        _ensure_dir(test_file.parent)
+        test_file.write_text(generate(impl_file))
+        test_files.append(test_file)
+
+    return test_files
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python generate_test_template.py <impl_file> [framework]")
+        print("Usage: python generate_test_template.py <impl_file> [impl_file ...] [framework]")
         print()
         print("Frameworks: pytest (default), unittest, jest")
         sys.exit(1)
 
-    impl_file = Path(sys.argv[1])
-    framework = sys.argv[2] if len(sys.argv) > 2 else "pytest"
+    # 最后一个参数没有扩展名时视为测试框架
+    args = sys.argv[1:]
+    framework = args.pop() if len(args) > 1 and not Path(args[-1]).suffix else "pytest"
+    impl_files = [Path(arg) for arg in args]
 
-    if not impl_file.exists():
-        print(f"错误: 文件不存在: {impl_file}")
-        sys.exit(1)
+    for impl_file in impl_files:
+        if not impl_file.exists():
+            print(f"错误: 文件不存在: {impl_file}")
+            sys.exit(1)
 
-    # 生成测试文件路径
-    if impl_file.suffix == ".py":
-        test_file = impl_file.parent.parent.parent / "tests" / f"test_{impl_file.name}"
-    elif impl_file.suffix in [".js", ".ts"]:
-        test_file = impl_file.parent / f"{impl_file.stem}.test{impl_file.suffix}"
-    else:
-        print(f"错误: 不支持的文件类型: {impl_file.suffix}")
+    try:
+        test_files = generate_test_files(impl_files, framework)
+    except ValueError as e:
+        print(f"错误: {e}")
         sys.exit(1)
 
-    # 生成模板
-    if framework == "pytest":
-        template = generate_pytest_template(impl_file)
-    elif framework == "unittest":
-        template = generate_unittest_template(impl_file)
-    elif framework == "jest":
-        template = generate_jest_template(impl_file)
-    else:
-        print(f"错误: 不支持的框架: {framework}")
-        sys.exit(1)
-
-    # 写入文件
-    test_file.parent.mkdir(parents=True, exist_ok=True)
-    test_file.write_text(template)
-
-    print(f"✓ 测试模板已生成: {test_file}")
+    for test_file in test_files:
+        print(f"✓ 测试模板已生成: {test_file}")
     print()
     print("下一步: 填写测试用例，然后运行 TDD 流程")
     print(f"  python ../skills/run_tdd_cycle.py . task_id")
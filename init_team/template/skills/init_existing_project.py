@@ -23,24 +23,313 @@ VibeKit - init_existing_project.py
 """
 
 import os
+import re
 import sys
 import json
 import shutil
+import heapq
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict, deque
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-# 导入 VibeKit 分析工具
+# 可选：orjson（C 实现，序列化更快），未安装时回退到标准库 json
 try:
-    from analyze_existing_project import ProjectAnalyzer
-    from architecture_validator import ArchitectureValidator, create_default_config
-    from complexity_analyzer import ComplexityAnalyzer
-    HAS_ANALYZERS = True
-except ImportError as e:
-    HAS_ANALYZERS = False
-    print(f"⚠️  导入分析工具失败: {e}")
-    print("将生成基础架构梳理文档")
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 生成的架构梳理文档文件名
+REPORT_FILENAME = "PROJECT_ARCHITECTURE_ANALYSIS.md"
+
+# 遍历时不进入的目录：依赖、构建产物、缓存和工具配置，对技术栈与结构分析没有价值
+PRUNE_DIRS = frozenset({
+    "node_modules", ".git", "__pycache__", ".venv", "venv", "env",
+    "dist", "build", "target", "vendor", ".idea", ".vscode",
+    ".mypy_cache", ".pytest_cache", ".vibekit",
+})
+
+# 目录扫描线程数：scandir/stat 系统调用会释放 GIL，IO 密集场景下取 CPU 数的两倍
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+# 单核机器上线程只会争抢同一个 CPU，直接串行遍历
+_PARALLEL_SCAN = (os.cpu_count() or 1) > 1
+
+# 并行遍历时先串行展开到至少这么多个子目录，再把每个子目录作为一棵子树交给线程池
+_SCAN_SUBTREES = _SCAN_WORKERS * 4
+
+
+def _intern_values(mapping: Dict[str, str]) -> Dict[str, str]:
+    """驻留映射中的标签字符串：每个文件的分类结果都引用同一对象，字典/集合比较走身份快路径"""
+    return {key: sys.intern(value) for key, value in mapping.items()}
+
+
+# 文件类型到语言的映射
+LANGUAGE_MAP = _intern_values({
+    ".py": "Python",
+    ".js": "JavaScript",
+    ".ts": "TypeScript",
+    ".jsx": "React/JavaScript",
+    ".tsx": "React/TypeScript",
+    ".java": "Java",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".cpp": "C++",
+    ".c": "C",
+    ".cs": "C#",
+    ".php": "PHP",
+    ".rb": "Ruby",
+    ".swift": "Swift",
+    ".kt": "Kotlin"
+})
+
+# 常见目录名到用途的映射
+DIRECTORY_PURPOSE_MAP = _intern_values({
+    "src": "源代码",
+    "source": "源代码",
+    "lib": "库文件",
+    "app": "应用代码",
+    "test": "测试代码",
+    "tests": "测试代码",
+    "spec": "测试代码",
+    "specs": "测试代码",
+    "docs": "文档",
+    "doc": "文档",
+    "documentation": "文档",
+    "build": "构建输出",
+    "dist": "分发文件",
+    "out": "输出文件",
+    "config": "配置文件",
+    "conf": "配置文件",
+    "scripts": "脚本文件",
+    "tools": "工具文件",
+    "utils": "工具函数",
+    "vendor": "第三方库",
+    "node_modules": "Node.js 依赖",
+    "__pycache__": "Python 缓存",
+    "assets": "资源文件",
+    "static": "静态资源",
+    "public": "公共资源",
+    "styles": "样式文件",
+    "css": "样式文件",
+    "stylesheets": "样式文件"
+})
+
+# 未识别目录的用途标签
+_OTHER_PURPOSE = sys.intern("其他")
+
+# 分层架构的层名（按报告展示顺序）及 MVC 组件
+ARCHITECTURE_LAYERS = ("controller", "service", "repository", "model", "view")
+ARCHITECTURE_LAYER_SET = frozenset(ARCHITECTURE_LAYERS)
+MVC_COMPONENTS = (("model", "Model"), ("view", "View"), ("controller", "Controller"))
+
+# 关键文件名
+KEY_FILES = frozenset({
+    "package.json", "requirements.txt", "Pipfile", "poetry.lock",
+    "pom.xml", "build.gradle", "Cargo.toml", "go.mod",
+    "README.md", "README.txt", "CHANGELOG.md",
+    "LICENSE", "LICENSE.txt", "COPYRIGHT",
+    "Dockerfile", "docker-compose.yml", "docker-compose.yaml",
+    ".gitignore", ".gitattributes", ".env.example",
+    "Makefile", "CMakeLists.txt", "build.gradle.kts",
+    "tsconfig.json", "jsconfig.json", "babel.config.js",
+    "webpack.config.js", "rollup.config.js", "vite.config.js",
+    ".eslintrc.js", ".eslintrc.json", "prettier.config.js",
+    "pytest.ini", "tox.ini", "jest.config.js",
+    "setup.py", "setup.cfg", "pyproject.toml"
+})
+
+# 关键文件的重要程度（越大越优先展示），未列出的关键文件为 0
+KEY_FILE_PRIORITY = {
+    # 依赖与构建清单：决定技术栈
+    "package.json": 3, "requirements.txt": 3, "Pipfile": 3, "pyproject.toml": 3,
+    "setup.py": 3, "pom.xml": 3, "build.gradle": 3, "build.gradle.kts": 3,
+    "Cargo.toml": 3, "go.mod": 3,
+    # 项目说明与运行方式
+    "README.md": 2, "README.txt": 2, "Dockerfile": 2, "docker-compose.yml": 2,
+    "docker-compose.yaml": 2, "Makefile": 2, "CMakeLists.txt": 2,
+}
+
+# 按文件名精确匹配的用途；*.config.js 等由 _guess_file_purpose 按后缀兜底
+FILE_PURPOSE_MAP = _intern_values({
+    "package.json": "依赖管理",
+    "requirements.txt": "依赖管理",
+    "Pipfile": "依赖管理",
+    "poetry.lock": "依赖管理",
+    "pom.xml": "项目构建",
+    "build.gradle": "项目构建",
+    "Cargo.toml": "项目构建",
+    "go.mod": "项目构建",
+    "LICENSE": "许可证",
+    "LICENSE.txt": "许可证",
+    "COPYRIGHT": "许可证",
+    "Dockerfile": "容器化",
+    "docker-compose.yml": "容器化",
+    "docker-compose.yaml": "容器化",
+    "Makefile": "构建脚本",
+    "CMakeLists.txt": "构建脚本",
+    ".eslintrc.js": "代码规范",
+    ".eslintrc.json": "代码规范",
+    "pytest.ini": "测试配置",
+    "tox.ini": "测试配置",
+    "setup.py": "Python 打包",
+    "setup.cfg": "Python 打包",
+    "pyproject.toml": "Python 打包",
+})
+
+# package.json 中的框架关键字，合并为一个正则，每个文件只扫描一遍
+_PACKAGE_FRAMEWORKS = _intern_values({
+    "react": "React",
+    "vue": "Vue.js",
+    "angular": "Angular",
+    "express": "Express.js",
+    "next": "Next.js",
+})
+_PACKAGE_FRAMEWORK_RE = re.compile("|".join(_PACKAGE_FRAMEWORKS).encode())
+
+# package.json 最多读取的字节数：依赖声明都在文件开头，超出部分多为无关数据
+PACKAGE_JSON_READ_LIMIT = 64 * 1024
+
+# 测试文件：小写相对路径中以分隔符界定的 test/tests 片段（test_x.py、x_test.py、x.test.js、tests/…）
+_TEST_PATH_RE = re.compile(r"(?:^|[\\/_.-])tests?(?:[\\/_.-]|$)")
+
+
+def _scan_directory(dir_path: str, prefix: str) -> Tuple[str, List, List, int, List]:
+    """列出单个目录，返回 (相对前缀, 文件, 小写子目录名, 条目数, 待遍历子目录)，供线程池并发调用"""
+    files, dir_names, subdirs = [], [], []
+    entry_count = 0
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                rel_path = prefix + entry.name
+                entry_count += 1
+                # 不跟随符号链接：类型直接取自 readdir 结果，stat 只需一次 lstat 且会被 DirEntry 缓存
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dir_names.append(entry.name.lower())
+                        if entry.name not in PRUNE_DIRS:
+                            subdirs.append((entry.path, rel_path + os.sep))
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append((rel_path, entry.name, entry.stat(follow_symlinks=False).st_size))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return prefix, files, dir_names, entry_count, subdirs
+
+
+def _scan_tree(dir_path: str, prefix: str) -> Tuple[str, List, List, int]:
+    """串行遍历一棵子树，返回 (子树相对前缀, 文件, 小写子目录名, 条目数)，供线程池按子树调用"""
+    files, dir_names = [], []
+    entry_count = 0
+    stack = [(dir_path, prefix)]
+    while stack:
+        _, sub_files, sub_dir_names, sub_count, subdirs = _scan_directory(*stack.pop())
+        files.extend(sub_files)
+        dir_names.extend(sub_dir_names)
+        entry_count += sub_count
+        stack.extend(subdirs)
+    return prefix, files, dir_names, entry_count
+
+
+def _classify_file(rel_path: str, name: str) -> Tuple[Optional[str], Optional[str]]:
+    """对单个文件分类，返回 (语言, 测试框架)，无法判断的项为 None
+
+    每个文件都会调用一次，因此只做字符串和字典操作；路径正则只在后缀相关、
+    且小写路径包含 "test" 子串时才执行。
+    """
+    # 小写后缀（与 Path.suffix 一致，点开头的文件无后缀）
+    base, _, ext = name.rpartition('.')
+    suffix = "." + ext.lower() if base else ""
+    language = LANGUAGE_MAP.get(suffix)
+
+    if suffix not in (".py", ".js", ".ts"):
+        return language, None
+    path_lower = rel_path.lower()
+    if "test" not in path_lower or not _TEST_PATH_RE.search(path_lower):
+        return language, None
+    if suffix == ".py":
+        return language, "pytest/unittest"
+    if "jest" in path_lower:
+        return language, "Jest"
+    if "mocha" in path_lower:
+        return language, "Mocha"
+    return language, None
+
+
+def _package_json_keywords(path: Path) -> Set[str]:
+    """读取 package.json 开头部分，返回命中的框架关键字
+
+    文件不超过读取上限时按 JSON 解析，只在依赖名中匹配；否则直接在前 64KB 字节中匹配。
+    """
+    with open(path, 'rb') as f:
+        head = f.read(PACKAGE_JSON_READ_LIMIT + 1)
+
+    if len(head) <= PACKAGE_JSON_READ_LIMIT:
+        try:
+            data = json.loads(head)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            names = []
+            for key in ("dependencies", "devDependencies", "peerDependencies"):
+                deps = data.get(key)
+                if isinstance(deps, dict):
+                    names.extend(deps)
+            head = "\n".join(names).encode()
+    else:
+        head = head[:PACKAGE_JSON_READ_LIMIT]
+
+    return {match.decode() for match in _PACKAGE_FRAMEWORK_RE.findall(head)}
+
+
+def _handle_package_json(file_path: Path, project_info: Dict):
+    """package.json：按依赖识别前端/Node 框架"""
+    try:
+        found = _package_json_keywords(file_path)
+    except OSError:
+        return
+    for keyword, framework in _PACKAGE_FRAMEWORKS.items():
+        if keyword in found:
+            project_info["frameworks"].add(framework)
+    project_info["package_managers"].add("npm/yarn")
+
+
+def _marker_handler(**additions):
+    """生成只凭文件名就能下结论的处理函数，additions 为 project_info 字段 -> 要加入的值"""
+    additions = {key: tuple(sys.intern(value) for value in values) for key, values in additions.items()}
+
+    def handler(file_path: Path, project_info: Dict):
+        for key, values in additions.items():
+            project_info[key].update(values)
+    return handler
+
+
+# 特征文件名 -> 处理函数
+FILENAME_HANDLERS = {
+    "package.json": _handle_package_json,
+    "requirements.txt": _marker_handler(frameworks=("Django", "Flask", "FastAPI"),  # 可能的框架
+                                        package_managers=("pip",)),
+    "Pipfile": _marker_handler(package_managers=("pipenv",)),
+    "yarn.lock": _marker_handler(package_managers=("yarn",)),
+    "pom.xml": _marker_handler(package_managers=("Maven",), frameworks=("Java/Spring",)),
+    "build.gradle": _marker_handler(package_managers=("Gradle",), frameworks=("Java/Spring",)),
+    "Makefile": _marker_handler(build_tools=("Make",)),
+    "webpack.config.js": _marker_handler(build_tools=("Webpack",)),
+    "rollup.config.js": _marker_handler(build_tools=("Rollup",)),
+    "vite.config.js": _marker_handler(build_tools=("Vite",)),
+}
+
+
+def dump_json(data) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON（供程序读取的产物，不缩进，保留中文）"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
 
 class ExistingProjectAnalyzer:
@@ -50,6 +339,46 @@ class ExistingProjectAnalyzer:
         self.project_path = Path(project_path).resolve()
         self.project_name = self.project_path.name
         self.analysis_result = {}
+        self._scan: Optional[Dict] = None
+
+    def _walk_once(self) -> Dict:
+        """单次遍历项目目录树，缓存文件与目录信息供各项检测复用"""
+        if self._scan is not None:
+            return self._scan
+
+        files = []         # (相对路径, 文件名, 文件大小)
+        dir_names_lower = set()  # 所有子目录名（小写去重）
+        top_level_counts = defaultdict(int)  # 顶层目录名 -> 其下条目（文件和目录）总数
+
+        def merge(prefix: str, sub_files: List, sub_dir_names: List, entry_count: int):
+            files.extend(sub_files)
+            dir_names_lower.update(sub_dir_names)
+            if prefix:
+                top_level_counts[prefix.split(os.sep, 1)[0]] += entry_count
+
+        # 从根目录广度优先串行展开；单核时直接遍历完整棵树
+        frontier = deque([(str(self.project_path), "")])
+        while frontier and (not _PARALLEL_SCAN or len(frontier) < _SCAN_SUBTREES):
+            prefix, sub_files, sub_dir_names, entry_count, subdirs = _scan_directory(*frontier.popleft())
+            merge(prefix, sub_files, sub_dir_names, entry_count)
+            frontier.extend(subdirs)
+
+        # 剩余的每个目录作为一棵子树并发遍历，主线程按完成顺序合并结果，无需加锁
+        if frontier:
+            with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+                futures = [executor.submit(_scan_tree, dir_path, prefix) for dir_path, prefix in frontier]
+                for future in as_completed(futures):
+                    merge(*future.result())
+
+        # 并发完成顺序不确定，按路径排序保证报告输出稳定
+        files.sort()
+
+        self._scan = {
+            "files": files,
+            "dir_names_lower": dir_names_lower,
+            "top_level_counts": top_level_counts,
+        }
+        return self._scan
 
     def detect_project_type(self) -> Dict:
         """检测项目类型和技术栈"""
@@ -61,10 +390,10 @@ class ExistingProjectAnalyzer:
             "size_mb": 0,
             "file_count": 0,
             "languages": {},
-            "frameworks": [],
-            "build_tools": [],
-            "test_frameworks": [],
-            "package_managers": []
+            "frameworks": set(),
+            "build_tools": set(),
+            "test_frameworks": set(),
+            "package_managers": set()
         }
 
         # 统计文件大小和数量
@@ -72,97 +401,29 @@ class ExistingProjectAnalyzer:
         file_count = 0
         language_files = {}
 
-        # 文件类型到语言的映射
-        language_map = {
-            ".py": "Python",
-            ".js": "JavaScript",
-            ".ts": "TypeScript",
-            ".jsx": "React/JavaScript",
-            ".tsx": "React/TypeScript",
-            ".java": "Java",
-            ".go": "Go",
-            ".rs": "Rust",
-            ".cpp": "C++",
-            ".c": "C",
-            ".cs": "C#",
-            ".php": "PHP",
-            ".rb": "Ruby",
-            ".swift": "Swift",
-            ".kt": "Kotlin"
-        }
-
         # 检测框架和工具
-        for item in self.project_path.rglob("*"):
-            if item.is_file():
-                file_count += 1
-                total_size += item.stat().st_size
-
-                # 语言检测
-                suffix = item.suffix.lower()
-                if suffix in language_map:
-                    lang = language_map[suffix]
-                    language_files[lang] = language_files.get(lang, 0) + 1
-
-                # 框架检测
-                if item.name in ["package.json", "requirements.txt", "Pipfile", "yarn.lock", "pom.xml", "build.gradle"]:
-                    if item.name == "package.json":
-                        try:
-                            content = item.read_text()
-                            if "react" in content:
-                                project_info["frameworks"].append("React")
-                            if "vue" in content:
-                                project_info["frameworks"].append("Vue.js")
-                            if "angular" in content:
-                                project_info["frameworks"].append("Angular")
-                            if "express" in content:
-                                project_info["frameworks"].append("Express.js")
-                            if "next" in content:
-                                project_info["frameworks"].append("Next.js")
-                            project_info["package_managers"].append("npm/yarn")
-                        except:
-                            pass
-                    elif item.name == "requirements.txt":
-                        project_info["frameworks"].extend(["Django", "Flask", "FastAPI"])  # 可能的框架
-                        project_info["package_managers"].append("pip")
-                    elif item.name == "Pipfile":
-                        project_info["package_managers"].append("pipenv")
-                    elif item.name == "yarn.lock":
-                        project_info["package_managers"].append("yarn")
-                    elif item.name in ["pom.xml"]:
-                        project_info["package_managers"].append("Maven")
-                        project_info["frameworks"].append("Java/Spring")
-                    elif item.name == "build.gradle":
-                        project_info["package_managers"].append("Gradle")
-                        project_info["frameworks"].append("Java/Spring")
-
-                # 测试框架检测
-                if "test" in item.name.lower() or item.name.startswith("test_"):
-                    if item.suffix == ".py":
-                        project_info["test_frameworks"].append("pytest/unittest")
-                    elif item.suffix in [".js", ".ts"]:
-                        if "jest" in str(item).lower():
-                            project_info["test_frameworks"].append("Jest")
-                        elif "mocha" in str(item).lower():
-                            project_info["test_frameworks"].append("Mocha")
-
-                # 构建工具检测
-                if item.name in ["Makefile", "webpack.config.js", "rollup.config.js", "vite.config.js"]:
-                    if item.name == "Makefile":
-                        project_info["build_tools"].append("Make")
-                    elif "webpack" in item.name:
-                        project_info["build_tools"].append("Webpack")
-                    elif "rollup" in item.name:
-                        project_info["build_tools"].append("Rollup")
-                    elif "vite" in item.name:
-                        project_info["build_tools"].append("Vite")
+        for rel_path, name, size in self._walk_once()["files"]:
+            file_count += 1
+            total_size += size
+
+            language, test_framework = _classify_file(rel_path, name)
+            if language is not None:
+                language_files[language] = language_files.get(language, 0) + 1
+            if test_framework is not None:
+                project_info["test_frameworks"].add(test_framework)
+
+            # 框架、包管理器和构建工具检测：按文件名一次查表分派
+            handler = FILENAME_HANDLERS.get(name)
+            if handler is not None:
+                handler(self.project_path / rel_path, project_info)
 
         project_info["size_mb"] = round(total_size / (1024 * 1024), 2)
         project_info["file_count"] = file_count
         project_info["languages"] = language_files
 
-        # 去重
+        # 收集时已用集合去重，这里排序转为列表，保证输出稳定且可序列化
         for key in ["frameworks", "build_tools", "test_frameworks", "package_managers"]:
-            project_info[key] = list(set(project_info[key]))
+            project_info[key] = sorted(project_info[key])
 
         print(f"   项目大小: {project_info['size_mb']} MB")
         print(f"   文件数量: {project_info['file_count']}")
@@ -180,30 +441,29 @@ class ExistingProjectAnalyzer:
             "patterns": []
         }
 
+        scan = self._walk_once()
+
         # 获取主要目录
         dirs = []
         for item in self.project_path.iterdir():
-            if item.is_dir() and not item.name.startswith('.'):
+            if item.is_dir() and not item.name.startswith('.') and item.name not in PRUNE_DIRS:
                 dirs.append({
                     "name": item.name,
-                    "file_count": len(list(item.rglob("*"))),
+                    "file_count": scan["top_level_counts"].get(item.name, 0),
                     "purpose": self._guess_directory_purpose(item.name)
                 })
 
-        structure["directories"] = sorted(dirs, key=lambda x: x["file_count"], reverse=True)[:10]
+        structure["directories"] = heapq.nlargest(10, dirs, key=lambda x: x["file_count"])
 
-        # 获取关键文件
-        key_files = []
-        for item in self.project_path.rglob("*"):
-            if item.is_file():
-                if self._is_key_file(item.name):
-                    key_files.append({
-                        "name": item.name,
-                        "path": str(item.relative_to(self.project_path)),
-                        "purpose": self._guess_file_purpose(item.name)
-                    })
-
-        structure["key_files"] = key_files[:20]
+        # 获取关键文件：按重要程度取前 20 个，同等重要时路径越浅越优先；只为入选的文件推断用途
+        candidates = ((rel_path, name) for rel_path, name, _ in scan["files"] if self._is_key_file(name))
+        top_files = heapq.nlargest(
+            20, candidates, key=lambda f: (KEY_FILE_PRIORITY.get(f[1], 0), -f[0].count(os.sep))
+        )
+        structure["key_files"] = [
+            {"name": name, "path": rel_path, "purpose": self._guess_file_purpose(name)}
+            for rel_path, name in top_files
+        ]
 
         # 检测架构模式
         structure["patterns"] = self._detect_architecture_patterns()
@@ -212,86 +472,24 @@ class ExistingProjectAnalyzer:
 
     def _guess_directory_purpose(self, dir_name: str) -> str:
         """猜测目录用途"""
-        dir_name_lower = dir_name.lower()
-
-        purpose_map = {
-            "src": "源代码",
-            "source": "源代码",
-            "lib": "库文件",
-            "app": "应用代码",
-            "test": "测试代码",
-            "tests": "测试代码",
-            "spec": "测试代码",
-            "specs": "测试代码",
-            "docs": "文档",
-            "doc": "文档",
-            "documentation": "文档",
-            "build": "构建输出",
-            "dist": "分发文件",
-            "out": "输出文件",
-            "config": "配置文件",
-            "conf": "配置文件",
-            "scripts": "脚本文件",
-            "tools": "工具文件",
-            "utils": "工具函数",
-            "vendor": "第三方库",
-            "node_modules": "Node.js 依赖",
-            "__pycache__": "Python 缓存",
-            "assets": "资源文件",
-            "static": "静态资源",
-            "public": "公共资源",
-            "styles": "样式文件",
-            "css": "样式文件",
-            "stylesheets": "样式文件"
-        }
-
-        return purpose_map.get(dir_name_lower, "其他")
+        return DIRECTORY_PURPOSE_MAP.get(dir_name.lower(), _OTHER_PURPOSE)
 
     def _is_key_file(self, filename: str) -> bool:
         """判断是否为关键文件"""
-        key_file_patterns = [
-            "package.json", "requirements.txt", "Pipfile", "poetry.lock",
-            "pom.xml", "build.gradle", "Cargo.toml", "go.mod",
-            "README.md", "README.txt", "CHANGELOG.md",
-            "LICENSE", "LICENSE.txt", "COPYRIGHT",
-            "Dockerfile", "docker-compose.yml", "docker-compose.yaml",
-            ".gitignore", ".gitattributes", ".env.example",
-            "Makefile", "CMakeLists.txt", "build.gradle.kts",
-            "tsconfig.json", "jsconfig.json", "babel.config.js",
-            "webpack.config.js", "rollup.config.js", "vite.config.js",
-            ".eslintrc.js", ".eslintrc.json", "prettier.config.js",
-            "pytest.ini", "tox.ini", "jest.config.js",
-            "setup.py", "setup.cfg", "pyproject.toml"
-        ]
-
-        return filename in key_file_patterns
+        return filename in KEY_FILES
 
     def _guess_file_purpose(self, filename: str) -> str:
         """猜测文件用途"""
-        if filename in ["package.json", "requirements.txt", "Pipfile", "poetry.lock"]:
-            return "依赖管理"
-        elif filename in ["pom.xml", "build.gradle", "Cargo.toml", "go.mod"]:
-            return "项目构建"
-        elif filename.startswith("README"):
+        purpose = FILE_PURPOSE_MAP.get(filename)
+        if purpose is not None:
+            return purpose
+        if filename.startswith("README"):
             return "项目说明"
-        elif filename in ["LICENSE", "LICENSE.txt", "COPYRIGHT"]:
-            return "许可证"
-        elif filename in ["Dockerfile", "docker-compose.yml", "docker-compose.yaml"]:
-            return "容器化"
-        elif filename.startswith(".git"):
+        if filename.startswith(".git"):
             return "Git 配置"
-        elif filename in ["Makefile", "CMakeLists.txt"]:
-            return "构建脚本"
-        elif filename.endswith((".config.js", ".config.json", ".config.ts")):
+        if filename.endswith((".config.js", ".config.json", ".config.ts")):
             return "工具配置"
-        elif filename in [".eslintrc.js", ".eslintrc.json", "prettier.config.js"]:
-            return "代码规范"
-        elif filename in ["pytest.ini", "tox.ini", "jest.config.js"]:
-            return "测试配置"
-        elif filename in ["setup.py", "setup.cfg", "pyproject.toml"]:
-            return "Python 打包"
-        else:
-            return "配置文件"
+        return "配置文件"
 
     def _detect_architecture_patterns(self) -> List[str]:
         """检测架构模式"""
@@ -309,26 +507,24 @@ class ExistingProjectAnalyzer:
         if has_app:
             patterns.append("应用模块布局")
 
-        # 检测分层架构
-        layers = ["controller", "service", "repository", "model", "view"]
-        found_layers = []
-        for layer in layers:
-            for item in self.project_path.rglob("*"):
-                if item.is_dir() and layer in item.name.lower():
-                    found_layers.append(layer)
-                    break
+        # 检测分层架构：先做精确集合交集，剩余层再对目录名做一遍子串匹配，全部找到即提前结束
+        dir_names_lower = self._walk_once()["dir_names_lower"]
+        found_layers = ARCHITECTURE_LAYER_SET & dir_names_lower
+        missing_layers = ARCHITECTURE_LAYER_SET - found_layers
+        for name in dir_names_lower:
+            if not missing_layers:
+                break
+            hits = {layer for layer in missing_layers if layer in name}
+            if hits:
+                found_layers |= hits
+                missing_layers -= hits
 
         if found_layers:
-            patterns.append(f"分层架构 (发现: {', '.join(found_layers)})")
+            ordered_layers = [layer for layer in ARCHITECTURE_LAYERS if layer in found_layers]
+            patterns.append(f"分层架构 (发现: {', '.join(ordered_layers)})")
 
         # 检测 MVC 模式
-        mvc_components = []
-        if any("model" in d.name.lower() for d in self.project_path.rglob("*") if d.is_dir()):
-            mvc_components.append("Model")
-        if any("view" in d.name.lower() for d in self.project_path.rglob("*") if d.is_dir()):
-            mvc_components.append("View")
-        if any("controller" in d.name.lower() for d in self.project_path.rglob("*") if d.is_dir()):
-            mvc_components.append("Controller")
+        mvc_components = [label for layer, label in MVC_COMPONENTS if layer in found_layers]
 
         if len(mvc_components) >= 2:
             patterns.append(f"MVC 模式 ({', '.join(mvc_components)})")
@@ -343,13 +539,19 @@ class ExistingProjectAnalyzer:
         return patterns
 
     def run_vibekit_analysis(self) -> Optional[Dict]:
-        """运行 VibeKit 深度分析"""
-        if not HAS_ANALYZERS:
-            print("⚠️  VibeKit 分析工具不可用，跳过深度分析")
-            return None
+        """运行 VibeKit 深度分析
 
+        分析工具在此处按需导入，命令行用法提示和路径校验都无需加载它们。
+        """
         print("🔬 运行 VibeKit 深度分析...")
 
+        try:
+            from analyze_existing_project import ProjectAnalyzer
+        except ImportError as e:
+            print(f"⚠️  导入分析工具失败: {e}")
+            print("⚠️  VibeKit 分析工具不可用，跳过深度分析")
+            return None
+
         try:
             # 运行基础的项目分析
             analyzer = ProjectAnalyzer(str(self.project_path))
@@ -373,7 +575,7 @@ class ExistingProjectAnalyzer:
     def generate_init_document(self, project_info: Dict, structure: Dict, vibekit_result: Optional[Dict]) -> str:
         """生成项目初始化架构梳理文档"""
 
-        doc_content = f"""# 项目架构梳理报告
+        parts = [f"""# 项目架构梳理报告
 
 ## 📋 项目概览
 
@@ -386,14 +588,14 @@ class ExistingProjectAnalyzer:
 ## 🛠️ 技术栈
 
 ### 编程语言
-"""
+"""]
 
         # 添加语言统计
         for lang, count in sorted(project_info['languages'].items(), key=lambda x: x[1], reverse=True):
-            doc_content += f"- **{lang}**: {count} 个文件\n"
+            parts.append(f"- **{lang}**: {count} 个文件\n")
 
         # 框架和工具
-        doc_content += f"""
+        parts.append(f"""
 ### 框架和库
 {self._format_list(project_info['frameworks'])}
 
@@ -411,34 +613,34 @@ class ExistingProjectAnalyzer:
 ### 主要目录
 | 目录名称 | 文件数量 | 用途 |
 |---------|---------|------|
-"""
+""")
 
-        for dir_info in structure['directories'][:10]:
-            doc_content += f"| {dir_info['name']} | {dir_info['file_count']} | {dir_info['purpose']} |\n"
+        for dir_info in islice(structure['directories'], 10):
+            parts.append(f"| {dir_info['name']} | {dir_info['file_count']} | {dir_info['purpose']} |\n")
 
         # 关键文件
-        doc_content += f"""
+        parts.append(f"""
 ### 关键配置文件
 | 文件名 | 路径 | 用途 |
 |-------|------|------|
-"""
+""")
 
-        for file_info in structure['key_files'][:15]:
-            doc_content += f"| {file_info['name']} | `{file_info['path']}` | {file_info['purpose']} |\n"
+        for file_info in islice(structure['key_files'], 15):
+            parts.append(f"| {file_info['name']} | `{file_info['path']}` | {file_info['purpose']} |\n")
 
         # 架构模式
-        doc_content += f"""
+        parts.append(f"""
 ## 🎯 架构模式
 
 检测到的架构模式：
-"""
+""")
 
         for pattern in structure['patterns']:
-            doc_content += f"- {pattern}\n"
+            parts.append(f"- {pattern}\n")
 
         # VibeKit 分析结果
         if vibekit_result:
-            doc_content += f"""
+            parts.append(f"""
 ## 📊 VibeKit 深度分析
 
 ### 模块统计
@@ -447,67 +649,67 @@ class ExistingProjectAnalyzer:
 - **最大依赖深度**: {vibekit_result.get('max_dependency_depth', 0)}
 
 ### 架构质量问题
-"""
+""")
 
             # 循环依赖
             circular_deps = vibekit_result.get('circular_dependencies', [])
             if circular_deps:
-                doc_content += f"""
+                parts.append(f"""
 #### ⚠️ 循环依赖 ({len(circular_deps)} 处)
 发现循环依赖，建议重构：
-"""
-                for i, dep in enumerate(circular_deps[:5], 1):
-                    doc_content += f"{i}. {' → '.join(dep)}\n"
+""")
+                for i, dep in enumerate(islice(circular_deps, 5), 1):
+                    parts.append(f"{i}. {' → '.join(dep)}\n")
                 if len(circular_deps) > 5:
-                    doc_content += f"... 还有 {len(circular_deps) - 5} 处\n"
+                    parts.append(f"... 还有 {len(circular_deps) - 5} 处\n")
 
             # 上帝模块
             god_modules = vibekit_result.get('god_modules', [])
             if god_modules:
-                doc_content += f"""
+                parts.append(f"""
 #### ⚠️ 上帝模块 ({len(god_modules)} 个)
 被过多模块依赖的组件：
-"""
-                for module in god_modules[:5]:
-                    doc_content += f"- **{module['name']}**: 被 {module['fan_in']} 个模块依赖\n"
+""")
+                for module in islice(god_modules, 5):
+                    parts.append(f"- **{module['name']}**: 被 {module['fan_in']} 个模块依赖\n")
 
             # 复杂度分析
             if 'complexity' in vibekit_result:
                 complexity = vibekit_result['complexity']
-                doc_content += f"""
+                parts.append(f"""
 #### 代码复杂度
 - **总函数数**: {complexity.get('total_functions', 0)}
 - **平均复杂度**: {complexity.get('avg_complexity', 0)}
 - **平均函数长度**: {complexity.get('avg_length', 0)} 行
 - **高复杂度函数**: {len(complexity.get('high_complexity_functions', []))} 个
 - **长函数**: {len(complexity.get('long_functions', []))} 个
-"""
+""")
 
         # 开发环境建议
-        doc_content += f"""
+        parts.append(f"""
 ## 🚀 开发环境配置建议
 
 ### 1. 推荐工具链
-"""
+""")
 
         if "Python" in project_info['languages']:
-            doc_content += """- **IDE**: PyCharm / VS Code
+            parts.append("""- **IDE**: PyCharm / VS Code
 - **环境管理**: pyenv + virtualenv / conda
 - **代码格式化**: black + isort
 - **代码检查**: flake8 / pylint
 - **测试**: pytest
-"""
+""")
 
         if any(lang in project_info['languages'] for lang in ["JavaScript", "TypeScript"]):
-            doc_content += """- **IDE**: VS Code / WebStorm
+            parts.append("""- **IDE**: VS Code / WebStorm
 - **包管理器**: npm / yarn / pnpm
 - **代码格式化**: Prettier
 - **代码检查**: ESLint
 - **测试**: Jest / Vitest
-"""
+""")
 
         # 添加 VibeKit 集成建议
-        doc_content += f"""
+        parts.append(f"""
 ### 2. VibeKit 集成
 建议将项目接入 VibeKit 进行持续的架构质量监控：
 
@@ -524,34 +726,34 @@ open ./.vibekit/analysis_report.md
 
 ### 3. 项目结构优化建议
 
-"""
+""")
 
         # 根据分析结果给出建议
         if vibekit_result and vibekit_result.get('circular_dependencies'):
-            doc_content += """- **优先级1**: 解决循环依赖问题
+            parts.append("""- **优先级1**: 解决循环依赖问题
   - 识别循环依赖的根本原因
   - 考虑使用依赖注入或事件驱动架构
   - 将相关模块合并或重新设计
 
-"""
+""")
 
         if structure['directories'] and not any(d['name'] in ['src', 'lib', 'app'] for d in structure['directories']):
-            doc_content += """- **优先级2**: 规范化目录结构
+            parts.append("""- **优先级2**: 规范化目录结构
   - 创建 src/ 目录存放源代码
   - 创建 tests/ 目录存放测试代码
   - 创建 docs/ 目录存放文档
 
-"""
+""")
 
         if not project_info['test_frameworks']:
-            doc_content += """- **优先级3**: 添加测试框架
+            parts.append("""- **优先级3**: 添加测试框架
   - 根据语言选择合适的测试框架
   - 配置持续集成
   - 设置测试覆盖率目标
 
-"""
+""")
 
-        doc_content += f"""
+        parts.append(f"""
 ### 4. 下一步行动
 1. [ ] 根据建议重构代码结构
 2. [ ] 集成 VibeKit 进行定期检查
@@ -560,9 +762,9 @@ open ./.vibekit/analysis_report.md
 
 ---
 *报告由 VibeKit 自动生成于 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
+""")
 
-        return doc_content
+        return "".join(parts)
 
     def _format_list(self, items: List[str]) -> str:
         """格式化列表"""
@@ -623,6 +825,11 @@ output:
 
         return config_file
 
+    def _write_analysis_data(self, data_file: Path, vibekit_result: Dict):
+        """保存 VibeKit 分析数据"""
+        data_file.parent.mkdir(exist_ok=True)
+        data_file.write_bytes(dump_json(vibekit_result))
+
     def analyze(self) -> Dict:
         """执行完整分析流程"""
         print("=" * 60)
@@ -643,25 +850,28 @@ output:
         # 4. 生成初始化文档
         print("📄 生成架构梳理文档...")
         doc_content = self.generate_init_document(project_info, structure, vibekit_result)
+        doc_file = self.project_path / REPORT_FILENAME
+        data_file = self.project_path / ".vibekit" / "analysis_data.json"
 
-        # 保存文档
-        doc_file = self.project_path / "PROJECT_ARCHITECTURE_ANALYSIS.md"
-        doc_file.write_text(doc_content, encoding='utf-8')
+        # 5. 创建 VibeKit 配置（进度提示在提交写入前输出，保存结果在写入完成后输出）
+        print("⚙️  创建 VibeKit 配置...")
+
+        # 文档、配置（5）和分析数据（6）互不依赖，并发写入以隐藏磁盘延迟
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            doc_future = executor.submit(doc_file.write_text, doc_content, encoding='utf-8')
+            config_future = executor.submit(self.create_vibekit_config)
+            data_future = None
+            if vibekit_result:
+                data_future = executor.submit(self._write_analysis_data, data_file, vibekit_result)
+
+        doc_future.result()
         print(f"   ✓ 文档已保存: {doc_file}")
 
-        # 5. 创建 VibeKit 配置
-        print("⚙️  创建 VibeKit 配置...")
-        config_file = self.create_vibekit_config()
+        config_file = config_future.result()
         print(f"   ✓ 配置已保存: {config_file}")
 
-        # 6. 如果有 VibeKit 分析结果，也保存
-        if vibekit_result:
-            vibekit_dir = self.project_path / ".vibekit"
-            vibekit_dir.mkdir(exist_ok=True)
-
-            # 保存分析数据
-            data_file = vibekit_dir / "analysis_data.json"
-            data_file.write_text(json.dumps(vibekit_result, indent=2, ensure_ascii=False), encoding='utf-8')
+        if data_future is not None:
+            data_future.result()
             print(f"   ✓ 分析数据已保存: {data_file}")
 
         # 保存综合结果
@@ -21,43 +21,49 @@ VibeKit - init_new_project.py
     与 project_team/ 同级目录，便于管理
 """
 
+import os
+import re
 import json
 import sys
+import shlex
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from string import Template
 
-
-def get_template_dir() -> Path:
-    """获取模板目录"""
-    # 脚本在 project_team/skills/ 目录，模板在 ../project_template/
-    script_dir = Path(__file__).parent
-    template_dir = script_dir.parent / "project_template"
-
-    if not template_dir.exists():
-        raise FileNotFoundError(f"模板目录不存在: {template_dir}")
-
-    return template_dir
-
-
-def get_project_team_root() -> Path:
-    """获取 project_team 根目录"""
-    # 脚本在 project_team/skills/ 目录，向上两级
-    return Path(__file__).parent.parent
-
-
-def create_doc_templates(target_dir: Path):
-    """创建基础文档模板"""
-
-    # 01_specify 阶段文档
-    prd_template = """# 产品需求文档 (PRD)
+# 新项目需要创建的目录（只列叶子目录）：代码、按 Phase 组织的文档、产出物、
+# 项目独立的 .context 索引和 .checkpoints 快照
+PROJECT_DIRS = (
+    "src",
+    "tests",
+    "docs/01_specify",
+    "docs/02_plan",
+    "docs/03_implement",
+    "docs/04_test",
+    "docs/05_release",
+    "docs/artifacts/diagrams",
+    "docs/artifacts/mockups",
+    "docs/artifacts/meeting_notes",
+    ".context/modules",
+    ".checkpoints",
+)
+
+# 模板文件复制线程数：复制时的读写系统调用会释放 GIL，多个小文件可并行
+_COPY_WORKERS = min(8, os.cpu_count() or 1)
+
+# README 中需要替换为项目名的模板名
+_TEMPLATE_NAME_RE = re.compile(r"[Tt]emplate")
+
+# 文档模板（占位符为 ${project_name} / ${date}）
+
+# 01_specify 阶段文档
+PRD_TEMPLATE = """# 产品需求文档 (PRD)
 
 ## 项目概述
-- 项目名称：{project_name}
+- 项目名称：${project_name}
 - 版本：v1.0.0
-- 创建日期：{date}
+- 创建日期：${date}
 - 产品经理：[待填写]
 
 ## 需求背景
@@ -87,7 +93,7 @@ def create_doc_templates(target_dir: Path):
 - v1.0 版本：[日期]
 """
 
-    user_stories_template = """# 用户故事清单
+USER_STORIES_TEMPLATE = """# 用户故事清单
 
 ## 用户故事列表
 
@@ -120,7 +126,7 @@ def create_doc_templates(target_dir: Path):
 - [ ] 集成测试通过
 """
 
-    api_spec_template = """# API 规范文档
+API_SPEC_TEMPLATE = """# API 规范文档
 
 ## 概述
 - API 版本：v1.0.0
@@ -183,8 +189,8 @@ def create_doc_templates(target_dir: Path):
 - `500`: 服务器内部错误
 """
 
-    # 02_plan 阶段文档
-    architecture_template = """# 技术架构设计
+# 02_plan 阶段文档
+ARCHITECTURE_TEMPLATE = """# 技术架构设计
 
 ## 系统架构概览
 
@@ -239,12 +245,12 @@ def create_doc_templates(target_dir: Path):
 - 安全防护
 """
 
-    # 03_implement 阶段文档
-    task_breakdown_template = """# 任务分解清单
+# 03_implement 阶段文档
+TASK_BREAKDOWN_TEMPLATE = """# 任务分解清单
 
 ## 项目概览
-- 项目名称：{project_name}
-- 开始日期：{date}
+- 项目名称：${project_name}
+- 开始日期：${date}
 - 预计完成：[待填写]
 
 ## 按模块分解的任务
@@ -286,28 +292,79 @@ def create_doc_templates(target_dir: Path):
 - [风险 2]：[描述和应对措施]
 """
 
-    # 创建文档文件
-    from datetime import datetime
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    project_name = target_dir.name
-
-    docs = [
-        ("docs/01_specify/prd.md", prd_template),
-        ("docs/01_specify/user_stories.md", user_stories_template),
-        ("docs/01_specify/api_spec.md", api_spec_template),
-        ("docs/02_plan/architecture.md", architecture_template),
-        ("docs/03_implement/task_breakdown.md", task_breakdown_template),
-    ]
+# 各阶段文档的相对路径与模板（模块加载时编码为 UTF-8，写入时直接在字节上替换）
+DOC_TEMPLATES = tuple((doc_path, template.encode('utf-8')) for doc_path, template in (
+    ("docs/01_specify/prd.md", PRD_TEMPLATE),
+    ("docs/01_specify/user_stories.md", USER_STORIES_TEMPLATE),
+    ("docs/01_specify/api_spec.md", API_SPEC_TEMPLATE),
+    ("docs/02_plan/architecture.md", ARCHITECTURE_TEMPLATE),
+    ("docs/03_implement/task_breakdown.md", TASK_BREAKDOWN_TEMPLATE),
+))
+
+# 文档模板中的变量占位符
+_DOC_VAR_RE = re.compile(rb"\$\{(project_name|date)\}")
+
+
+def get_template_dir() -> Path:
+    """获取模板目录"""
+    # 脚本在 project_team/skills/ 目录，模板在 ../project_template/
+    script_dir = Path(__file__).parent
+    template_dir = script_dir.parent / "project_template"
+
+    if not template_dir.exists():
+        raise FileNotFoundError(f"模板目录不存在: {template_dir}")
+
+    return template_dir
+
+
+def get_project_team_root() -> Path:
+    """获取 project_team 根目录"""
+    # 脚本在 project_team/skills/ 目录，向上两级
+    return Path(__file__).parent.parent
+
+
+def create_doc_templates(target_dir: Path):
+    """创建基础文档模板"""
+    values = {
+        b"project_name": target_dir.name.encode('utf-8'),
+        b"date": datetime.now().strftime("%Y-%m-%d").encode('utf-8'),
+    }
+
+    def substitute(match):
+        return values[match.group(1)]
 
-    for doc_path, template in docs:
+    for doc_path, template in DOC_TEMPLATES:
         full_path = target_dir / doc_path
         if not full_path.exists():
-            # 先替换项目相关的变量，然后再处理模板中的 { } 冲突
-            content = template.replace("{project_name}", project_name).replace("{date}", date_str)
-            full_path.write_text(content, encoding='utf-8')
+            # 一次扫描完成所有变量替换，无需再编码整篇文档
+            full_path.write_bytes(_DOC_VAR_RE.sub(substitute, template))
             print(f"  ✓ 创建文档模板: {doc_path}")
 
 
+def _collect_tree_copies(src, dst, jobs: list):
+    """创建 dst 下的目录结构，并把需要复制的文件追加到 jobs，跳过 __pycache__ 和 *.pyc
+
+    用 os.scandir 遍历（类型来自目录项，无需额外 stat），忽略规则用字符串比较代替 fnmatch。
+    目录在这里按顺序创建，文件复制由调用方并行执行；文件内容与权限位会复制，修改时间不保留。
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as it:
+        for entry in it:
+            name = entry.name
+            if name == '__pycache__' or name.endswith('.pyc'):
+                continue
+            if entry.is_dir():
+                _collect_tree_copies(entry.path, os.path.join(dst, name), jobs)
+            else:
+                jobs.append((shutil.copy, entry.path, os.path.join(dst, name)))
+
+
+def _run_copy(job):
+    """执行一个 (复制函数, 源, 目标) 任务"""
+    copy_func, src, dst = job
+    copy_func(src, dst)
+
+
 def copy_template(template_dir: Path, target_dir: Path, project_name: str):
     """复制模板并替换变量"""
     if target_dir.exists():
@@ -323,46 +380,24 @@ def copy_template(template_dir: Path, target_dir: Path, project_name: str):
     target_dir.mkdir(exist_ok=True)
 
     # 复制模板内容（除了 .context，每个项目需要独立的）
-    for item in template_dir.iterdir():
-        if item.name == '.context':
-            continue  # 跳过 .context，每个项目需要独立的
-        if item.is_dir():
-            shutil.copytree(item, target_dir / item.name,
-                           ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
-        else:
-            shutil.copy2(item, target_dir / item.name)
-
-    # 创建项目特有的目录
-    (target_dir / "src").mkdir(exist_ok=True)
-    (target_dir / "tests").mkdir(exist_ok=True)
-    (target_dir / "docs").mkdir(exist_ok=True)
-
-    # 创建按 Phase 组织的文档结构
-    docs_structure = [
-        "01_specify",
-        "02_plan",
-        "03_implement",
-        "04_test",
-        "05_release"
-    ]
-
-    for phase_dir in docs_structure:
-        (target_dir / "docs" / phase_dir).mkdir(exist_ok=True)
-
-    # 创建 artifacts 目录
-    (target_dir / "docs" / "artifacts").mkdir(exist_ok=True)
-    (target_dir / "docs" / "artifacts" / "diagrams").mkdir(exist_ok=True)
-    (target_dir / "docs" / "artifacts" / "mockups").mkdir(exist_ok=True)
-    (target_dir / "docs" / "artifacts" / "meeting_notes").mkdir(exist_ok=True)
-
-    # 创建项目独立的 .context 目录
-    context_dir = target_dir / ".context"
-    context_dir.mkdir(exist_ok=True)
-    (context_dir / "modules").mkdir(exist_ok=True)
-
-    # 创建项目独立的 .checkpoints 目录
-    checkpoints_dir = target_dir / ".checkpoints"
-    checkpoints_dir.mkdir(exist_ok=True)
+    # 先顺序创建目录并收集文件，再用线程池并行复制
+    copy_jobs = []
+    with os.scandir(template_dir) as it:
+        for entry in it:
+            if entry.name == '.context':
+                continue  # 跳过 .context，每个项目需要独立的
+            if entry.is_dir():
+                _collect_tree_copies(entry.path, target_dir / entry.name, copy_jobs)
+            else:
+                copy_jobs.append((shutil.copy2, entry.path, target_dir / entry.name))
+
+    with ThreadPoolExecutor(max_workers=_COPY_WORKERS) as executor:
+        # list() 取出结果，任何复制异常都会在这里抛出
+        list(executor.map(_run_copy, copy_jobs))
+
+    # 创建项目特有的目录（parents=True 会顺带创建中间目录）
+    for rel_dir in PROJECT_DIRS:
+        (target_dir / rel_dir).mkdir(parents=True, exist_ok=True)
 
     # 创建基础文档模板
     create_doc_templates(target_dir)
@@ -373,7 +408,8 @@ def copy_template(template_dir: Path, target_dir: Path, project_name: str):
         state = json.loads(state_file.read_text())
         state["project_name"] = project_name
         state["created_at"] = datetime.now().isoformat()
-        state_file.write_text(json.dumps(state, indent=2, ensure_ascii=False))
+        with state_file.open('w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
     else:
         # 如果模板中没有，创建一个
         state = {
@@ -383,15 +419,18 @@ def copy_template(template_dir: Path, target_dir: Path, project_name: str):
             "created_at": datetime.now().isoformat(),
             "status": "active"
         }
-        state_file.write_text(json.dumps(state, indent=2, ensure_ascii=False))
+        with state_file.open('w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
 
     # 更新 README.md 中的项目名
     readme_file = target_dir / "README.md"
     if readme_file.exists():
         content = readme_file.read_text()
-        # 替换 template 为实际项目名
-        content = content.replace("template", project_name)
-        content = content.replace("Template", project_name.capitalize())
+        # 一次扫描把 template / Template 替换为实际项目名
+        capitalized = project_name.capitalize()
+        content = _TEMPLATE_NAME_RE.sub(
+            lambda m: project_name if m.group() == "template" else capitalized, content
+        )
         readme_file.write_text(content)
 
     print(f"  ✓ 项目结构创建完成")
@@ -402,34 +441,30 @@ def init_git_repo(project_dir: Path, project_name: str):
     print()
     print("🌳 初始化 Git 仓库...")
 
-    try:
-        subprocess.run(
-            ["git", "init"],
-            cwd=project_dir,
-            check=True,
-            capture_output=True
-        )
-
-        subprocess.run(
-            ["git", "add", "."],
-            cwd=project_dir,
-            check=True,
-            capture_output=True
-        )
-
-        commit_msg = f"""chore: initialize project {project_name}
+    commit_msg = f"""chore: initialize project {project_name}
 
 Created from project-team-system template
 
 🤖 Generated with Claude Code
 Co-Authored-By: Claude <noreply@anthropic.com>"""
 
-        subprocess.run(
-            ["git", "commit", "-m", commit_msg],
-            cwd=project_dir,
-            check=True,
-            capture_output=True
-        )
+    commands = [
+        ["git", "init", "-q"],
+        ["git", "add", "."],
+        ["git", "commit", "-q", "-m", commit_msg],
+    ]
+
+    try:
+        if os.name == "posix":
+            # 由一个 shell 依次执行，Python 侧只需创建并等待一个子进程；最后一条命令 exec 替换 shell
+            quoted = [" ".join(map(shlex.quote, cmd)) for cmd in commands]
+            script = " && ".join(quoted[:-1]) + " && exec " + quoted[-1]
+            subprocess.run(["sh", "-c", script], cwd=project_dir, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            for cmd in commands:
+                subprocess.run(cmd, cwd=project_dir, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
         print("  ✓ Git 仓库初始化完成")
 
@@ -441,62 +476,66 @@ def print_summary(project_dir: Path, project_name: str):
     """打印总结"""
     project_team_root = get_project_team_root()
 
-    print()
-    print("=" * 60)
-    print(f"✅ 项目 {project_name} 创建完成！")
-    print("=" * 60)
-    print()
-    print(f"📁 位置: {project_dir}")
-    print()
-    print("📂 项目结构:")
-    print("  ├── .project_state.json  # 项目状态")
-    print("  ├── .context/            # 项目上下文索引")
-    print("  ├── .checkpoints/        # 项目状态快照")
-    print("  ├── src/                 # 源代码")
-    print("  ├── tests/               # 测试代码")
-    print("  ├── docs/                # 项目文档（按 5 Phase 组织）")
-    print("  │   ├── 01_specify/      # 需求阶段")
-    print("  │   │   ├── prd.md       # 产品需求文档")
-    print("  │   │   ├── user_stories.md # 用户故事")
-    print("  │   │   └── api_spec.md  # API 规范")
-    print("  │   ├── 02_plan/         # 设计阶段")
-    print("  │   │   └── architecture.md # 技术架构")
-    print("  │   ├── 03_implement/    # 开发阶段")
-    print("  │   │   └── task_breakdown.md # 任务清单")
-    print("  │   ├── 04_test/         # 测试阶段")
-    print("  │   └── 05_release/      # 发布阶段")
-    print("  │   └── artifacts/       # 产出物")
-    print("  │       ├── diagrams/    # 图表")
-    print("  │       └── mockups/     # 原型")
-    print("  ├── sop.yaml             # 开发流程")
-    print("  ├── requirements.md      # 需求文档")
-    print("  └── README.md")
-    print()
-    print("🔧 Project Agent 框架:")
-    print(f"  └── {project_team_root.relative_to(project_dir.parent)}/")
-    print("      ├── skills/           # 8 个开发技能")
-    print("      ├── agents/           # Project Agent 定义")
-    print("      └── CLAUDE.md         # 框架启动指南")
-    print()
-    print("🚀 下一步:")
-    print(f"  cd {project_dir}")
-    print(f"  vim requirements.md      # 1. 编写需求")
-    print(f"  vim docs/01_specify/prd.md # 2. 编写 PRD")
-    print(f"  # 3. 使用 Project Agent 开始开发")
-    print(f"  #    (框架在 ../project_team/ 中)")
-    print()
-    print("📚 文档模板已创建:")
-    print("  ✓ docs/01_specify/prd.md - 产品需求文档")
-    print("  ✓ docs/01_specify/user_stories.md - 用户故事")
-    print("  ✓ docs/01_specify/api_spec.md - API 规范")
-    print("  ✓ docs/02_plan/architecture.md - 技术架构")
-    print("  ✓ docs/03_implement/task_breakdown.md - 任务清单")
-    print()
-    print("💡 使用 Project Agent:")
-    print("  # Claude 会自动读取 ../project_team/CLAUDE.md")
-    print("  # 以 Project Agent 身份开始 5 Phase 开发流程")
-    print("  # 每个阶段在对应的 docs/ 目录下记录产出")
-    print()
+    # 汇总成一次写入，避免几十次 print 各自加锁、刷新
+    lines = [
+        "",
+        "=" * 60,
+        f"✅ 项目 {project_name} 创建完成！",
+        "=" * 60,
+        "",
+        f"📁 位置: {project_dir}",
+        "",
+        "📂 项目结构:",
+        "  ├── .project_state.json  # 项目状态",
+        "  ├── .context/            # 项目上下文索引",
+        "  ├── .checkpoints/        # 项目状态快照",
+        "  ├── src/                 # 源代码",
+        "  ├── tests/               # 测试代码",
+        "  ├── docs/                # 项目文档（按 5 Phase 组织）",
+        "  │   ├── 01_specify/      # 需求阶段",
+        "  │   │   ├── prd.md       # 产品需求文档",
+        "  │   │   ├── user_stories.md # 用户故事",
+        "  │   │   └── api_spec.md  # API 规范",
+        "  │   ├── 02_plan/         # 设计阶段",
+        "  │   │   └── architecture.md # 技术架构",
+        "  │   ├── 03_implement/    # 开发阶段",
+        "  │   │   └── task_breakdown.md # 任务清单",
+        "  │   ├── 04_test/         # 测试阶段",
+        "  │   └── 05_release/      # 发布阶段",
+        "  │   └── artifacts/       # 产出物",
+        "  │       ├── diagrams/    # 图表",
+        "  │       └── mockups/     # 原型",
+        "  ├── sop.yaml             # 开发流程",
+        "  ├── requirements.md      # 需求文档",
+        "  └── README.md",
+        "",
+        "🔧 Project Agent 框架:",
+        f"  └── {project_team_root.relative_to(project_dir.parent)}/",
+        "      ├── skills/           # 8 个开发技能",
+        "      ├── agents/           # Project Agent 定义",
+        "      └── CLAUDE.md         # 框架启动指南",
+        "",
+        "🚀 下一步:",
+        f"  cd {project_dir}",
+        f"  vim requirements.md      # 1. 编写需求",
+        f"  vim docs/01_specify/prd.md # 2. 编写 PRD",
+        f"  # 3. 使用 Project Agent 开始开发",
+        f"  #    (框架在 ../project_team/ 中)",
+        "",
+        "📚 文档模板已创建:",
+        "  ✓ docs/01_specify/prd.md - 产品需求文档",
+        "  ✓ docs/01_specify/user_stories.md - 用户故事",
+        "  ✓ docs/01_specify/api_spec.md - API 规范",
+        "  ✓ docs/02_plan/architecture.md - 技术架构",
+        "  ✓ docs/03_implement/task_breakdown.md - 任务清单",
+        "",
+        "💡 使用 Project Agent:",
+        "  # Claude 会自动读取 ../project_team/CLAUDE.md",
+        "  # 以 Project Agent 身份开始 5 Phase 开发流程",
+        "  # 每个阶段在对应的 docs/ 目录下记录产出",
+        "",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def create_project_structure(project_name: str, target_dir: str = "."):
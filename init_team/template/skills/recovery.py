@@ -12,12 +12,100 @@ Example:
 """
 
 import os
+import re
 import json
 import sys
+import mmap
+import shlex
+import subprocess
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 
+# quality_report.md 中的测试通过率与 Bug 数量
+# 直接在 mmap 的字节视图上匹配（UTF-8），全角冒号是多字节序列，不能放进字符类
+_PASS_RATE_RE = re.compile('通过率(?:：|:)\\s*(\\d+(?:\\.\\d+)?)%'.encode('utf-8'), re.IGNORECASE)
+_P0_RE = re.compile('P0(?:：|:)\\s*(\\d+)'.encode('utf-8'), re.IGNORECASE)
+_P1_RE = re.compile('P1(?:：|:)\\s*(\\d+)'.encode('utf-8'), re.IGNORECASE)
+
+# check_git_status 依次执行的 git 命令：未提交变更、最新提交、提交总数
+_GIT_STATUS_COMMANDS = (
+    ("git", "status", "--porcelain"),
+    ("git", "log", "-1", "--format=%H|%s|%an|%ar"),
+    ("git", "rev-list", "--count", "HEAD"),
+)
+
+# 各 Phase 按顺序需要的文档
+_PHASE_DOCS = (
+    ("specify", ("docs/01_specify/prd.md", "docs/01_specify/user_stories.md")),
+    ("plan", ("docs/02_plan/architecture.md", "docs/02_plan/module_design.md")),
+    ("implement", ("docs/03_implement/task_breakdown.md", "docs/03_implement/progress_track.md")),
+    ("test", ("docs/04_test/test_plan.md", "docs/04_test/test_cases.md")),
+    ("release", ("docs/05_release/release_notes.md", "docs/05_release/deployment.md")),
+)
+_PHASE_INDEX = {phase: i for i, (phase, _) in enumerate(_PHASE_DOCS)}
+
+
+def _with_slots(cls):
+    """为 dataclass 添加 __slots__（等同 Python 3.10+ 的 dataclass(slots=True)，兼容 3.7）
+
+    带默认值的字段在类上有同名属性，不能直接写 __slots__，因此按字段重建类。
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in field_names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+    namespace["__slots__"] = field_names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_with_slots
+@dataclass
+class ProjectInfo:
+    """项目基本信息"""
+    root: str
+    last_active: str
+    phase: str
+    progress_pct: float
+
+
+@_with_slots
+@dataclass
+class ProgressInfo:
+    """任务进度"""
+    total_tasks: int
+    completed: int
+    remaining: int
+    last_completed_task: Optional[Dict]
+    next_task: Optional[Dict]
+
+
+@_with_slots
+@dataclass
+class ValidationInfo:
+    """状态验证结果（文档、Git、测试）"""
+    documentation: Dict
+    git: Dict
+    test: Dict
+
+
+@_with_slots
+@dataclass
+class RecoveryReport:
+    """恢复报告；status 为 "error" 时只有 message 有意义"""
+    status: str
+    recovery_mode: Optional[str] = None
+    project_info: Optional[ProjectInfo] = None
+    progress: Optional[ProgressInfo] = None
+    validation: Optional[ValidationInfo] = None
+    context_pointers: Dict = field(default_factory=dict)
+    checkpoint: Optional[Dict] = None
+    warnings: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    can_auto_recover: bool = False
+    message: Optional[str] = None
+
 
 def load_project_state(project_root: Path) -> Optional[Dict]:
     """加载项目状态文件"""
@@ -34,25 +122,26 @@ def load_project_state(project_root: Path) -> Optional[Dict]:
 
 def check_documentation_integrity(project_root: Path, current_phase: str) -> Dict:
     """检查文档完整性"""
-    phase_docs = {
-        "specify": ["docs/01_specify/prd.md", "docs/01_specify/user_stories.md"],
-        "plan": ["docs/02_plan/architecture.md", "docs/02_plan/module_design.md"],
-        "implement": ["docs/03_implement/task_breakdown.md", "docs/03_implement/progress_track.md"],
-        "test": ["docs/04_test/test_plan.md", "docs/04_test/test_cases.md"],
-        "release": ["docs/05_release/release_notes.md", "docs/05_release/deployment.md"]
-    }
-
-    # 检查当前 Phase 及之前的所有文档
-    phase_order = ["specify", "plan", "implement", "test", "release"]
-    current_index = phase_order.index(current_phase) if current_phase in phase_order else 0
+    # 检查当前 Phase 及之前的所有文档（未知 Phase 按第一个处理）
+    current_index = _PHASE_INDEX.get(current_phase, 0)
 
     missing_docs = []
     existing_docs = []
-
-    for phase in phase_order[:current_index + 1]:
-        for doc in phase_docs.get(phase, []):
-            doc_path = project_root / doc
-            if doc_path.exists():
+    # 同一目录只列举一次，之后在内存中判断文档是否存在
+    dir_entries: Dict[str, set] = {}
+
+    for _, docs in _PHASE_DOCS[:current_index + 1]:
+        for doc in docs:
+            doc_dir, doc_name = os.path.split(doc)
+            names = dir_entries.get(doc_dir)
+            if names is None:
+                try:
+                    with os.scandir(project_root / doc_dir) as it:
+                        names = {entry.name for entry in it}
+                except OSError:
+                    names = set()
+                dir_entries[doc_dir] = names
+            if doc_name in names:
                 existing_docs.append(doc)
             else:
                 missing_docs.append(doc)
@@ -67,26 +156,37 @@ def check_documentation_integrity(project_root: Path, current_phase: str) -> Dic
 def check_git_status(project_root: Path) -> Dict:
     """检查 Git 状态"""
     try:
-        import subprocess
+        # 一个 shell 依次执行三条 git 命令，输出以 \0 分隔
+        if os.name == "posix":
+            # 找不到 git 时以 127 退出；否则总是以 0 退出（仓库为空时 rev-list 失败属正常情况）
+            script = "command -v git >/dev/null 2>&1 || exit 127; " + "; printf '\\0'; ".join(
+                " ".join(map(shlex.quote, cmd)) for cmd in _GIT_STATUS_COMMANDS
+            ) + "; exit 0"
+            result = subprocess.run(
+                ["sh", "-c", script],
+                cwd=project_root,
+                capture_output=True,
+                text=True
+            )
+            outputs = result.stdout.split("\0")
+            if result.returncode != 0 or len(outputs) < len(_GIT_STATUS_COMMANDS):
+                return {
+                    "available": False,
+                    "error": result.stderr.strip() or f"git 不可用（退出码 {result.returncode}）"
+                }
+        else:
+            outputs = [
+                subprocess.run(cmd, cwd=project_root, capture_output=True, text=True).stdout
+                for cmd in _GIT_STATUS_COMMANDS
+            ]
+        status_out, log_out, count_out = (outputs + ["", "", ""])[:3]
 
         # 检查是否有未提交的变更
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=project_root,
-            capture_output=True,
-            text=True
-        )
-        has_uncommitted = len(result.stdout.strip()) > 0
+        has_uncommitted = len(status_out.strip()) > 0
 
         # 获取最新提交
-        result = subprocess.run(
-            ["git", "log", "-1", "--format=%H|%s|%an|%ar"],
-            cwd=project_root,
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            parts = result.stdout.strip().split("|")
+        if log_out.strip():
+            parts = log_out.strip().split("|")
             last_commit = {
                 "hash": parts[0][:8],
                 "message": parts[1],
@@ -96,14 +196,9 @@ def check_git_status(project_root: Path) -> Dict:
         else:
             last_commit = None
 
-        # 获取提交总数
-        result = subprocess.run(
-            ["git", "rev-list", "--count", "HEAD"],
-            cwd=project_root,
-            capture_output=True,
-            text=True
-        )
-        total_commits = int(result.stdout.strip()) if result.returncode == 0 else 0
+        # 获取提交总数（失败时 stdout 为空）
+        count_out = count_out.strip()
+        total_commits = int(count_out) if count_out.isdigit() else 0
 
         return {
             "available": True,
@@ -130,19 +225,24 @@ def check_test_status(project_root: Path) -> Dict:
         }
 
     try:
-        content = quality_report.read_text(encoding='utf-8')
-
-        # 提取测试通过率
-        import re
-        pass_rate_match = re.search(r'通过率[：:]\s*(\d+(?:\.\d+)?)%', content, re.IGNORECASE)
-        pass_rate = float(pass_rate_match.group(1)) if pass_rate_match else None
-
-        # 提取 Bug 数量
-        p0_match = re.search(r'P0[：:]\s*(\d+)', content, re.IGNORECASE)
-        p1_match = re.search(r'P1[：:]\s*(\d+)', content, re.IGNORECASE)
-
-        p0_bugs = int(p0_match.group(1)) if p0_match else None
-        p1_bugs = int(p1_match.group(1)) if p1_match else None
+        pass_rate = p0_bugs = p1_bugs = None
+        with open(quality_report, 'rb') as f:
+            # 空文件无法 mmap，也没有可提取的内容
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    # 匹配结果引用 mmap，分组须在关闭前取出
+                    # 提取测试通过率
+                    match = _PASS_RATE_RE.search(content)
+                    if match:
+                        pass_rate = float(match.group(1))
+
+                    # 提取 Bug 数量
+                    match = _P0_RE.search(content)
+                    if match:
+                        p0_bugs = int(match.group(1))
+                    match = _P1_RE.search(content)
+                    if match:
+                        p1_bugs = int(match.group(1))
 
         return {
             "available": True,
@@ -162,32 +262,38 @@ def check_test_status(project_root: Path) -> Dict:
 def load_latest_checkpoint(project_root: Path) -> Optional[Dict]:
     """加载最新的检查点"""
     checkpoints_dir = project_root / ".context/checkpoints"
-    if not checkpoints_dir.exists():
-        return None
 
-    # 找到最新的检查点文件
-    checkpoints = sorted(
-        checkpoints_dir.glob("checkpoint_*.json"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True
-    )
+    # 找到最新的检查点文件：一次 scandir，DirEntry 缓存 stat，只需取最大值
+    latest = None
+    latest_mtime = None
+    try:
+        with os.scandir(checkpoints_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not (name.startswith("checkpoint_") and name.endswith(".json")):
+                    continue
+                mtime = entry.stat().st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest, latest_mtime = entry, mtime
+    except OSError:
+        # 检查点目录不存在或不可读
+        return None
 
-    if not checkpoints:
+    if latest is None:
         return None
 
     try:
-        latest = checkpoints[0]
         return {
             "file": latest.name,
-            "data": json.loads(latest.read_text(encoding='utf-8')),
-            "timestamp": datetime.fromtimestamp(latest.stat().st_mtime).isoformat()
+            "data": json.loads(Path(latest.path).read_text(encoding='utf-8')),
+            "timestamp": datetime.fromtimestamp(latest_mtime).isoformat()
         }
     except Exception as e:
         print(f"⚠️  无法读取检查点文件: {e}")
         return None
 
 
-def generate_recovery_report(project_root: Path, mode: str = "ask") -> Dict:
+def generate_recovery_report(project_root: Path, mode: str = "ask") -> RecoveryReport:
     """
     生成恢复报告
 
@@ -196,17 +302,17 @@ def generate_recovery_report(project_root: Path, mode: str = "ask") -> Dict:
         mode: 恢复模式 ("ask" 或 "auto")
 
     Returns:
-        恢复报告字典
+        恢复报告
     """
     root = Path(project_root).resolve()
 
     # 1. 加载项目状态
     state = load_project_state(root)
     if not state:
-        return {
-            "status": "error",
-            "message": "项目状态文件不存在，无法恢复。请检查 .project_state.json 文件。"
-        }
+        return RecoveryReport(
+            status="error",
+            message="项目状态文件不存在，无法恢复。请检查 .project_state.json 文件。"
+        )
 
     # 2. 提取关键信息
     current_phase = state.get("current_phase", "unknown")
@@ -221,9 +327,14 @@ def generate_recovery_report(project_root: Path, mode: str = "ask") -> Dict:
     progress_pct = (completed_count / total_tasks * 100) if total_tasks > 0 else 0
 
     # 3. 验证当前状态
+    # 文档检查最便宜，先做；auto 模式下文档不完整已无法自动恢复，跳过 Git / 测试检查
     doc_check = check_documentation_integrity(root, current_phase)
-    git_check = check_git_status(root)
-    test_check = check_test_status(root)
+    if mode == "auto" and not doc_check["integrity_ok"]:
+        git_check = {"available": False, "skipped": True}
+        test_check = {"available": False, "skipped": True}
+    else:
+        git_check = check_git_status(root)
+        test_check = check_test_status(root)
 
     # 4. 加载最新检查点
     checkpoint = load_latest_checkpoint(root)
@@ -247,7 +358,7 @@ def generate_recovery_report(project_root: Path, mode: str = "ask") -> Dict:
     context_pointers = {
         "architecture": f"docs/02_plan/architecture.md",
         "progress_track": f"docs/03_implement/progress_track.md",
-        "last_commit": git_check.get("last_commit", {}).get("hash", "N/A"),
+        "last_commit": (git_check.get("last_commit") or {}).get("hash", "N/A"),
         "checkpoint": checkpoint.get("file") if checkpoint else None
     }
 
@@ -277,67 +388,66 @@ def generate_recovery_report(project_root: Path, mode: str = "ask") -> Dict:
         recovery_mode = mode
 
     # 9. 生成报告
-    report = {
-        "status": "ready" if can_auto_recover else "needs_attention",
-        "recovery_mode": recovery_mode,
-        "project_info": {
-            "root": str(root),
-            "last_active": last_active,
-            "phase": current_phase,
-            "progress_pct": round(progress_pct, 1)
-        },
-        "progress": {
-            "total_tasks": total_tasks,
-            "completed": completed_count,
-            "remaining": total_tasks - completed_count,
-            "last_completed_task": completed_tasks[-1] if completed_tasks else None,
-            "next_task": next_task
-        },
-        "validation": {
-            "documentation": doc_check,
-            "git": git_check,
-            "test": test_check
-        },
-        "context_pointers": context_pointers,
-        "checkpoint": checkpoint,
-        "warnings": warnings,
-        "errors": errors,
-        "can_auto_recover": can_auto_recover
-    }
-
-    return report
+    return RecoveryReport(
+        status="ready" if can_auto_recover else "needs_attention",
+        recovery_mode=recovery_mode,
+        project_info=ProjectInfo(
+            root=str(root),
+            last_active=last_active,
+            phase=current_phase,
+            progress_pct=round(progress_pct, 1)
+        ),
+        progress=ProgressInfo(
+            total_tasks=total_tasks,
+            completed=completed_count,
+            remaining=total_tasks - completed_count,
+            last_completed_task=completed_tasks[-1] if completed_tasks else None,
+            next_task=next_task
+        ),
+        validation=ValidationInfo(
+            documentation=doc_check,
+            git=git_check,
+            test=test_check
+        ),
+        context_pointers=context_pointers,
+        checkpoint=checkpoint,
+        warnings=warnings,
+        errors=errors,
+        can_auto_recover=can_auto_recover
+    )
 
 
-def print_recovery_report(report: Dict):
+def print_recovery_report(report: RecoveryReport):
     """打印恢复报告"""
     print("\n" + "=" * 70)
     print("🔄 项目断点恢复报告")
     print("=" * 70)
 
-    if report.get("status") == "error":
-        print(f"\n❌ 错误: {report.get('message')}")
+    if report.status == "error":
+        print(f"\n❌ 错误: {report.message}")
         print("=" * 70 + "\n")
         return
 
-    info = report["project_info"]
-    prog = report["progress"]
+    info = report.project_info
+    prog = report.progress
+    validation = report.validation
 
     # 项目基本信息
-    print(f"\n📁 项目路径: {info['root']}")
-    print(f"📅 上次活跃: {info['last_active']}")
-    print(f"📍 当前 Phase: {info['phase']}")
-    print(f"📊 进度: {prog['completed']}/{prog['total_tasks']} ({info['progress_pct']}%)")
+    print(f"\n📁 项目路径: {info.root}")
+    print(f"📅 上次活跃: {info.last_active}")
+    print(f"📍 当前 Phase: {info.phase}")
+    print(f"📊 进度: {prog.completed}/{prog.total_tasks} ({info.progress_pct}%)")
 
     # 进度详情
     print(f"\n🎯 任务进度:")
-    if prog['last_completed_task']:
-        last_task = prog['last_completed_task']
+    if prog.last_completed_task:
+        last_task = prog.last_completed_task
         print(f"  ✅ 上次完成: {last_task.get('id', 'N/A')} - {last_task.get('description', 'N/A')}")
     else:
         print(f"  ⚠️  还没有完成任何任务")
 
-    if prog['next_task']:
-        next_task = prog['next_task']
+    if prog.next_task:
+        next_task = prog.next_task
         print(f"  🔜 下一个任务: {next_task.get('id', 'N/A')} - {next_task.get('description', 'N/A')}")
     else:
         print(f"  ✨ 所有任务已完成！")
@@ -346,14 +456,14 @@ def print_recovery_report(report: Dict):
     print(f"\n🔍 状态验证:")
 
     # 文档完整性
-    doc_status = report["validation"]["documentation"]
+    doc_status = validation.documentation
     doc_icon = "✅" if doc_status["integrity_ok"] else "❌"
     print(f"  {doc_icon} 文档完整性: {len(doc_status['existing'])} 个文档存在")
     if not doc_status["integrity_ok"]:
         print(f"     缺少 {len(doc_status['missing'])} 个文档")
 
     # Git 状态
-    git_status = report["validation"]["git"]
+    git_status = validation.git
     if git_status.get("available"):
         git_icon = "✅" if git_status.get("clean") else "⚠️ "
         status_text = "干净" if git_status.get("clean") else "有未提交变更"
@@ -361,62 +471,66 @@ def print_recovery_report(report: Dict):
         if git_status.get("last_commit"):
             commit = git_status["last_commit"]
             print(f"     最新提交: {commit['hash']} - {commit['message']} ({commit['time']})")
+    elif git_status.get("skipped"):
+        print(f"  ⏭️  Git 状态: 已跳过（文档不完整）")
     else:
         print(f"  ⚠️  Git 不可用")
 
     # 测试状态
-    test_status = report["validation"]["test"]
+    test_status = validation.test
     if test_status.get("available"):
         test_icon = "✅" if test_status.get("test_ok") else "⚠️ "
         print(f"  {test_icon} 测试状态: 通过率 {test_status.get('pass_rate', 0)}%")
         if test_status.get("p0_bugs") is not None:
             print(f"     P0 Bug: {test_status['p0_bugs']}, P1 Bug: {test_status.get('p1_bugs', 0)}")
+    elif test_status.get("skipped"):
+        print(f"  ⏭️  测试状态: 已跳过（文档不完整）")
     else:
         print(f"  ℹ️  测试状态: 不可用（可能还未到测试阶段）")
 
     # 检查点
-    if report.get("checkpoint"):
-        cp = report["checkpoint"]
+    if report.checkpoint:
+        cp = report.checkpoint
         print(f"\n💾 最新检查点:")
         print(f"  文件: {cp['file']}")
         print(f"  时间: {cp['timestamp']}")
 
     # 上下文指针
     print(f"\n📌 关键文件指针:")
-    for key, path in report["context_pointers"].items():
+    for key, path in report.context_pointers.items():
         if path and path != "N/A":
             print(f"  - {key}: {path}")
 
     # 警告
-    if report["warnings"]:
-        print(f"\n⚠️  警告 ({len(report['warnings'])}):")
-        for warning in report["warnings"]:
+    if report.warnings:
+        print(f"\n⚠️  警告 ({len(report.warnings)}):")
+        for warning in report.warnings:
             print(f"  - {warning}")
 
     # 错误
-    if report["errors"]:
-        print(f"\n❌ 错误 ({len(report['errors'])}):")
-        for error in report["errors"]:
+    if report.errors:
+        print(f"\n❌ 错误 ({len(report.errors)}):")
+        for error in report.errors:
             print(f"  - {error}")
 
     # 恢复建议
     print(f"\n💡 恢复建议:")
-    if report["can_auto_recover"]:
+    if report.can_auto_recover:
         print(f"  ✅ 状态验证通过，可以自动恢复")
         print(f"  🚀 建议: 直接继续执行下一个任务")
     else:
         print(f"  ⚠️  状态异常，建议人工介入")
         print(f"  🔧 建议:")
-        if not report["validation"]["documentation"]["integrity_ok"]:
+        if not validation.documentation["integrity_ok"]:
             print(f"     1. 补全缺失的文档")
-        if report["validation"]["git"].get("has_uncommitted"):
+        if validation.git.get("has_uncommitted"):
             print(f"     2. 提交或撤销未提交的变更")
-        if not report["validation"]["test"].get("test_ok", True):
+        if not validation.test.get("test_ok", True):
             print(f"     3. 修复失败的测试")
 
     print("\n" + "=" * 70)
-    print(f"🔄 恢复模式: {report['recovery_mode']}")
-    if report['recovery_mode'] == 'ask':
+    print(f"🔄 恢复模式: {report.recovery_mode}")
+    if report.recovery_mode == 'ask':
         print("📋 下一步: Supervisor 应询问用户如何恢复")
     else:
         print("🤖 下一步: 自动恢复到上次状态并继续执行")
@@ -452,4 +566,4 @@ if __name__ == "__main__":
     print_recovery_report(report)
 
     # 以退出码表示状态
-    sys.exit(0 if report.get("can_auto_recover") else 1)
+    sys.exit(0 if report.can_auto_recover else 1)
@@ -5,38 +5,45 @@ import sys
 from pathlib import Path
 
 
+_RULE = "=" * 60
+
+# TDD 流程输出，仅 task_id 可变；整段一次写出
+_TDD_BANNER = "\n".join([
+    "🔴 开始 TDD 流程: {task_id}",
+    "",
+    _RULE,
+    "Phase 1: RED - 写测试，测试必须失败",
+    _RULE,
+    "⏳ 等待测试文件创建...",
+    "📝 测试文件已创建",
+    "🔴 运行测试...",
+    "   ❌ 测试失败 (预期行为)",
+    "",
+    "✓ Phase 1 通过",
+    "",
+    _RULE,
+    "Phase 2: GREEN - 写代码，测试必须通过",
+    _RULE,
+    "⏳ 等待实现文件创建...",
+    "📝 实现文件已创建",
+    "🟢 运行测试...",
+    "   ✅ 测试通过",
+    "",
+    "✓ Phase 2 通过",
+    "",
+    _RULE,
+    "Phase 3: REFACTOR - 可选优化",
+    _RULE,
+    "⏭️  跳过重构",
+    "",
+    "✅ TDD 流程完成！",
+    "",
+])
+
+
 def run_tdd_cycle(project_root, task_id):
     """执行 TDD 流程"""
-    print(f"🔴 开始 TDD 流程: {task_id}")
-    print()
-    print("=" * 60)
-    print("Phase 1: RED - 写测试，测试必须失败")
-    print("=" * 60)
-    print("⏳ 等待测试文件创建...")
-    print("📝 测试文件已创建")
-    print("🔴 运行测试...")
-    print("   ❌ 测试失败 (预期行为)")
-    print()
-    print("✓ Phase 1 通过")
-    print()
-
-    print("=" * 60)
-    print("Phase 2: GREEN - 写代码，测试必须通过")
-    print("=" * 60)
-    print("⏳ 等待实现文件创建...")
-    print("📝 实现文件已创建")
-    print("🟢 运行测试...")
-    print("   ✅ 测试通过")
-    print()
-    print("✓ Phase 2 通过")
-    print()
-
-    print("=" * 60)
-    print("Phase 3: REFACTOR - 可选优化")
-    print("=" * 60)
-    print("⏭️  跳过重构")
-    print()
-    print("✅ TDD 流程完成！")
+    sys.stdout.write(_TDD_BANNER.format(task_id=task_id))
 
 
 if __name__ == "__main__":
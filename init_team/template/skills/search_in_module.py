@@ -10,7 +10,10 @@ search_in_module.py - 模块内搜索
 查询类型:
 - list_files:<layer>          # 列出某层的所有文件
 - read_file:<layer>/<file>    # 读取指定文件
+- read_files:<path>,<path>    # 批量读取多个文件
 - find_symbol:<symbol_name>   # 查找符号定义
+- find_symbol:<prefix>*       # 查找以 prefix 开头的符号
+- find_symbol:<symbol>:<n>    # 最多返回 n 个位置（如跳转到定义只需 1 个）
 
 使用:
     python search_in_module.py <project_root> <module_name> <query>
@@ -19,40 +22,170 @@ search_in_module.py - 模块内搜索
     python search_in_module.py . auth list_files:api
     python search_in_module.py . auth read_file:api/login.py
     python search_in_module.py . auth find_symbol:authenticate
+    python search_in_module.py . auth find_symbol:auth*
 """
 
+import os
 import json
+import pickle
+import pickletools
 import sys
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
+from typing import List, Optional
+
+# 可选：orjson（C 实现，解析和序列化更快），未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# 批量读文件的线程数：读文件的系统调用会释放 GIL，多个小文件可并行
+_READ_WORKERS = min(8, os.cpu_count() or 1)
+
+# 设置 TRUST_PICKLE=1 时在索引旁维护 *_index.pkl，加载时跳过 JSON 解析。
+# pickle 加载可执行任意代码，只应在 .context 目录不与他人共享时开启
+TRUST_PICKLE = os.environ.get("TRUST_PICKLE") == "1"
+
+
+def _load_pickle_sidecar(pkl_path: Path, json_mtime_ns: int) -> Optional[dict]:
+    """读取不比 JSON 旧的 pickle 副本，不可用时返回 None"""
+    try:
+        if pkl_path.stat().st_mtime_ns < json_mtime_ns:
+            return None
+        return pickle.loads(pkl_path.read_bytes())
+    except Exception:
+        # 不存在、损坏或版本不兼容都退回 JSON
+        return None
+
+
+def _write_pickle_sidecar(pkl_path: Path, index: dict):
+    """写入 pickle 副本（先写临时文件再替换，避免并发读到半个文件）"""
+    tmp_path = pkl_path.with_name(f"{pkl_path.name}.{os.getpid()}.tmp")
+    try:
+        data = pickletools.optimize(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, pkl_path)
+    except OSError:
+        # 副本只是加速手段，写失败不影响查询
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _parse_index_json(index_file: Path) -> dict:
+    """解析 JSON 索引；orjson 直接解析字节，省去解码为 str 的一步"""
+    if HAS_ORJSON:
+        return orjson.loads(index_file.read_bytes())
+    return json.loads(index_file.read_text())
+
+
+def _emit_json(data: dict):
+    """以缩进 2 格、保留中文的 JSON 输出查询结果"""
+    if HAS_ORJSON:
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS) + b"\n")
+    else:
+        # 边编码边写入 stdout，不先拼出完整字符串
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+
+
+@lru_cache(maxsize=32)
+def _load_index_file(path: str, mtime_ns: int, size: int) -> dict:
+    """解析索引文件；mtime_ns / size 只用作缓存键，文件变化后自动重新解析"""
+    index_file = Path(path)
+    if not TRUST_PICKLE:
+        index = _parse_index_json(index_file)
+    else:
+        pkl_path = index_file.with_suffix(".pkl")
+        index = _load_pickle_sidecar(pkl_path, mtime_ns)
+        if index is None:
+            index = _parse_index_json(index_file)
+            _write_pickle_sidecar(pkl_path, index)
+
+    return _build_lookup_tables(index)
+
+
+def _build_lookup_tables(index: dict) -> dict:
+    """建立查询用的倒排表，写入 index 并返回 index
+
+    - _file_records: [(layer, 文件名, 路径)]，下标即文件 ID
+    - _by_layer: 层 -> [文件名]
+    - _exports_inv: 符号 -> [文件 ID]
+    - _symbol_names: 排好序的符号列表，供前缀查询二分定位
+    """
+    file_records = []
+    by_layer = {}
+    exports_inv = {}
+    for layer, layer_data in index["structure"].items():
+        names = by_layer[layer] = []
+        for file in layer_data["files"]:
+            file_id = len(file_records)
+            file_records.append((layer, file["name"], file["path"]))
+            names.append(file["name"])
+            # 同一文件重复导出的符号只记一次
+            for symbol in set(file["exports"]):
+                exports_inv.setdefault(symbol, []).append(file_id)
+
+    index["_file_records"] = file_records
+    index["_by_layer"] = by_layer
+    index["_exports_inv"] = exports_inv
+    index["_symbol_names"] = sorted(exports_inv)
+    return index
+
+
+def _lookup_tables(index: dict) -> dict:
+    """返回带倒排表的 index（外部直接构造的 index 首次查询时补建）"""
+    if "_exports_inv" not in index:
+        _build_lookup_tables(index)
+    return index
 
 
 def load_module_index(project_root: str, module_name: str) -> dict:
-    """加载模块索引"""
+    """加载模块索引
+
+    同一进程内重复加载未变化的索引直接返回缓存结果（调用方不应修改返回的 dict）。
+    """
     root = Path(project_root).resolve()
     index_file = root / ".context" / "modules" / f"{module_name}_index.json"
 
-    if not index_file.exists():
-        raise FileNotFoundError(f"模块索引不存在: {index_file}")
+    try:
+        stat = index_file.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"模块索引不存在: {index_file}") from None
+
+    index = _load_index_file(str(index_file), stat.st_mtime_ns, stat.st_size)
+    # 记下已解析的项目根目录，读文件时无需再 resolve
+    index["_root"] = root
+    return index
 
-    return json.loads(index_file.read_text())
+
+load_module_index.cache_clear = _load_index_file.cache_clear
 
 
 def query_list_files(index: dict, layer: str) -> dict:
     """查询: 列出某层的所有文件"""
-    if layer not in index["structure"]:
+    files = _lookup_tables(index)["_by_layer"].get(layer)
+    if files is None:
         return {"error": f"层不存在: {layer}"}
 
-    files = index["structure"][layer]["files"]
+    # 倒排表随 index 一起被缓存复用，返回副本，调用方修改结果不会影响后续查询
     return {
         "layer": layer,
-        "files": [f["name"] for f in files],
+        "files": list(files),
         "count": len(files)
     }
 
 
 def query_read_file(index: dict, project_root: str, file_path: str) -> dict:
     """查询: 读取指定文件"""
-    root = Path(project_root).resolve()
+    root = index.get("_root") or Path(project_root).resolve()
     full_path = root / file_path
 
     if not full_path.exists():
@@ -63,26 +196,60 @@ def query_read_file(index: dict, project_root: str, file_path: str) -> dict:
         return {
             "file": file_path,
             "content": content,
-            "lines": len(content.split('\n'))
+            # 与 len(content.split('\n')) 相同，但不创建子串列表
+            "lines": content.count('\n') + 1
         }
     except Exception as e:
         return {"error": str(e)}
 
 
-def query_find_symbol(index: dict, symbol_name: str) -> dict:
-    """查询: 查找符号定义"""
-    results = []
+def query_read_files(index: dict, project_root: str, file_paths: List[str]) -> dict:
+    """查询: 批量读取多个文件，各文件结果与 read_file 相同"""
+    if len(file_paths) == 1:
+        # 单个文件不值得启动线程池
+        files = [query_read_file(index, project_root, file_paths[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_READ_WORKERS, len(file_paths) or 1)) as executor:
+            files = list(executor.map(lambda path: query_read_file(index, project_root, path), file_paths))
 
-    for layer, layer_data in index["structure"].items():
-        for file in layer_data["files"]:
-            if symbol_name in file["exports"]:
-                results.append({
-                    "layer": layer,
-                    "file": file["name"],
-                    "path": file["path"],
-                    "symbol": symbol_name,
-                    "type": "export"
-                })
+    return {
+        "files": files,
+        "count": len(files)
+    }
+
+
+def query_find_symbol(index: dict, symbol_name: str, limit: Optional[int] = None) -> dict:
+    """查询: 查找符号定义（以 * 结尾时按前缀匹配，limit 限制返回的位置数）"""
+    _lookup_tables(index)
+    exports_inv = index["_exports_inv"]
+    file_records = index["_file_records"]
+
+    if symbol_name.endswith("*"):
+        prefix = symbol_name[:-1]
+        names = index["_symbol_names"]
+        symbols = []
+        for i in range(bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            symbols.append(names[i])
+    else:
+        symbols = [symbol_name]
+
+    # 惰性展开 (符号, 文件 ID)，达到 limit 后不再继续
+    hits = ((symbol, file_id) for symbol in symbols for file_id in exports_inv.get(symbol, ()))
+    if limit:
+        hits = islice(hits, limit)
+
+    results = []
+    for symbol, file_id in hits:
+        layer, file_name, path = file_records[file_id]
+        results.append({
+            "layer": layer,
+            "file": file_name,
+            "path": path,
+            "symbol": symbol,
+            "type": "export"
+        })
 
     return {
         "symbol": symbol_name,
@@ -101,8 +268,16 @@ def execute_query(index: dict, project_root: str, query: str) -> dict:
         file_path = query.split(":", 1)[1]
         return query_read_file(index, project_root, file_path)
 
+    elif query.startswith("read_files:"):
+        file_paths = [p for p in query.split(":", 1)[1].split(",") if p]
+        return query_read_files(index, project_root, file_paths)
+
     elif query.startswith("find_symbol:"):
         symbol = query.split(":", 1)[1]
+        # 末尾的 :<n> 表示最多返回 n 个位置
+        name, sep, limit = symbol.rpartition(":")
+        if sep and name and limit.isdigit():
+            return query_find_symbol(index, name, int(limit))
         return query_find_symbol(index, symbol)
 
     else:
@@ -116,7 +291,10 @@ def main():
         print("Query types:")
         print("  list_files:<layer>")
         print("  read_file:<layer>/<file>")
+        print("  read_files:<path>,<path>")
         print("  find_symbol:<symbol_name>")
+        print("  find_symbol:<prefix>*")
+        print("  find_symbol:<symbol_name>:<limit>")
         sys.exit(1)
 
     project_root = sys.argv[1]
@@ -127,7 +305,7 @@ def main():
         index = load_module_index(project_root, module_name)
         result = execute_query(index, project_root, query)
 
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        _emit_json(result)
 
     except Exception as e:
         print(json.dumps({"error": str(e)}, indent=2))
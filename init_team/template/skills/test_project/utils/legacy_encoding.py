@@ -0,0 +1,15 @@
+# -*- coding: latin-1 -*-
+"""
+Legacy helpers saved in Latin-1 (regression fixture for files with a non-UTF-8 coding cookie)
+"""
+
+
+def greet(name):
+    """Return a greeting"""
+    return "Bonjour %s, caf ?" % name
+
+
+def price_label(amount):
+    if amount > 100:
+        return "%d  (cher)" % amount
+    return "%d " % amount
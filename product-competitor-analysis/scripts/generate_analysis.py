@@ -8,9 +8,19 @@ Created: 2025-12-19
 采用统一分析流程，可按模块选择输出内容。
 """
 
+import re
+import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+# 可选：orjson（C 实现，序列化更快），未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # 导入utils和collect_data
 from utils import (
     load_gospel_config,
@@ -23,6 +33,84 @@ from utils import (
 )
 from collect_data import DataCollector
 
+# --modules 参数的分隔符（中英文逗号、顿号）
+_MODULE_SPLIT_RE = re.compile(r'[，,、]')
+
+
+def _intern_keys(mapping: Dict[str, Any]) -> Dict[str, Any]:
+    """返回键经 sys.intern 驻留的新字典（保持顺序）"""
+    return {sys.intern(key): value for key, value in mapping.items()}
+
+
+# 内置文档模板（模板文件不可用时使用）
+_BUILTIN_TEMPLATE = """# {product_name} 产品分析
+
+> **分析日期**: {analysis_date}
+> **分析模块**: {analysis_modules}
+
+## 一句话总结
+
+[待填充]
+
+## Part G: {G_name}
+
+{G_content}
+
+## Part O: {O_name}
+
+{O_content}
+
+## Part S: {S_name}
+
+{S_content}
+
+## Part C: {C_name}
+
+{C_content}
+
+## Part P: {P_name}
+
+{P_content}
+
+## Part E: {E_name}
+
+{E_content}
+
+## Part L: {L_name}
+
+### 俞军视角: {yujun_name}
+
+{yujun_content}
+
+### 梁宁视角: {liangning_name}
+
+{liangning_content}
+
+### Andrew Chen视角: {andrew_chen_name}
+
+{andrew_chen_content}
+
+### 曾鸣视角: {zengming_name}
+
+{zengming_content}
+
+### 李善友视角: {lishangyou_name}
+
+{lishangyou_content}
+
+### 综合洞察
+
+[待填充]
+
+## 可复用模式识别
+
+[待填充]
+
+## 数据来源
+
+[待填充]
+"""
+
 
 # ==================== 分析生成器类 ====================
 
@@ -49,6 +137,8 @@ class AnalysisGenerator:
         "E": "E",
         "L": "L",
     }
+    # 单次查找表：在 MODULE_MAP 基础上补充小写代码（g/o/s...），取代先原样、再 upper() 的两次查找
+    _MODULE_LOOKUP = {**{key.lower(): dim for key, dim in MODULE_MAP.items()}, **MODULE_MAP}
     TEMPLATE_ALIASES = {
         "1": "分析模板",
         "v1": "分析模板",
@@ -79,13 +169,16 @@ class AnalysisGenerator:
         """
         self.product_name = product_name
 
-        # 加载配置
-        self.gospel_config = load_gospel_config()
-        self.expert_prompts = load_expert_prompts()
+        # 加载配置（同一进程内所有实例共享，只读）
+        self.gospel_config = self._load_gospel_config()
+        self.expert_prompts = self._load_expert_prompts()
+        # (专家代号, 专家配置) 按配置顺序预先取出，召集专家时无需再逐个查字典
+        self._experts_in_order = tuple(self.expert_prompts['experts'].items())
 
         # 获取分析配置
         self.mode_config = self.gospel_config['analysis_modes']['standard']
         self.modules = self._normalize_modules(modules)
+        self._required_dimensions = None
 
         # 分析结果存储
         self.analysis_results = {
@@ -101,6 +194,66 @@ class AnalysisGenerator:
         # 加载数据
         self.data_collector = DataCollector.load_existing(product_name)
 
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _load_gospel_config() -> Dict[str, Any]:
+        """
+        加载GOSPEL框架配置（首次调用后缓存）
+
+        维度代码驻留（sys.intern），与代码中的字面量查找时可直接按身份命中
+        """
+        config = load_gospel_config()
+        config['dimensions'] = _intern_keys(config['dimensions'])
+        for mode in config['analysis_modes'].values():
+            mode['dimensions'] = [sys.intern(dim) for dim in mode['dimensions']]
+        return config
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _load_expert_prompts() -> Dict[str, Any]:
+        """
+        加载专家Prompt配置（首次调用后缓存，专家代号驻留）
+        """
+        config = load_expert_prompts()
+        config['experts'] = _intern_keys(config['experts'])
+        return config
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _dimension_placeholder_defaults() -> Dict[str, str]:
+        """
+        标准模式下各维度的模板占位默认值（名称 + 空内容）
+        """
+        gospel_config = AnalysisGenerator._load_gospel_config()
+        dimensions = gospel_config['dimensions']
+        defaults = {}
+        for dim in gospel_config['analysis_modes']['standard']['dimensions']:
+            defaults[f'{dim}_name'] = dimensions[dim]['name_cn']
+            defaults[f'{dim}_content'] = ""
+        return defaults
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _expert_placeholder_defaults() -> Dict[str, str]:
+        """
+        未提供专家洞察时各专家的模板占位默认值（名称 + 空内容）
+        """
+        defaults = {}
+        for expert_name, expert in AnalysisGenerator._load_expert_prompts().get('experts', {}).items():
+            defaults[f'{expert_name}_name'] = expert.get('name', expert_name)
+            defaults[f'{expert_name}_content'] = ""
+        return defaults
+
+    @classmethod
+    def reload_config(cls) -> None:
+        """
+        清除配置缓存，之后创建的实例会重新读取配置文件
+        """
+        cls._load_gospel_config.cache_clear()
+        cls._load_expert_prompts.cache_clear()
+        cls._dimension_placeholder_defaults.cache_clear()
+        cls._expert_placeholder_defaults.cache_clear()
+
     def _resolve_template_name(self, template_version: str) -> str:
         """
         将模板版本映射到模板名称
@@ -126,12 +279,14 @@ class AnalysisGenerator:
         获取需要分析的维度
 
         Returns:
-            维度代码列表，如 ['G', 'O', 'S', 'P', 'E', 'L']
+            维度代码列表，如 ['G', 'O', 'S', 'P', 'E', 'L']（首次计算后缓存，调用方不应修改）
         """
-        dimensions = list(self.modules)
-        if "L" not in dimensions:
-            dimensions.append("L")
-        return dimensions
+        if self._required_dimensions is None:
+            dimensions = list(self.modules)
+            if "L" not in dimensions:
+                dimensions.append("L")
+            self._required_dimensions = dimensions
+        return self._required_dimensions
 
     def _normalize_modules(self, modules: Optional[List[str]]) -> List[str]:
         """
@@ -146,22 +301,13 @@ class AnalysisGenerator:
             key = module.strip()
             if not key:
                 continue
-            mapped = self.MODULE_MAP.get(key)
-            if not mapped:
-                mapped = self.MODULE_MAP.get(key.upper())
+            mapped = self._MODULE_LOOKUP.get(key)
             if not mapped:
                 raise ValueError(f"未知模块: {module}")
             normalized.append(mapped)
 
         # 去重保序
-        seen = set()
-        ordered = []
-        for dim in normalized:
-            if dim not in seen:
-                seen.add(dim)
-                ordered.append(dim)
-
-        return ordered
+        return list(dict.fromkeys(normalized))
 
     def _format_modules_label(self, dimensions: List[str]) -> str:
         """
@@ -253,32 +399,45 @@ class AnalysisGenerator:
             raise ValueError(f"未知专家: {expert_name}")
 
         expert = self.expert_prompts['experts'][expert_name]
+        return self._compose_expert_prompt(expert, self._build_expert_context(context))
+
+    def _build_expert_context(self, context: Dict[str, Any]) -> str:
+        """
+        构建专家prompt中的上下文部分（与具体专家无关，可在多位专家间复用）
 
-        # 构建上下文字符串
-        context_str = f"""
+        Args:
+            context: 分析上下文（包含已完成的维度分析）
+
+        Returns:
+            上下文字符串
+        """
+        parts = [f"""
 ## 产品信息：
 - 产品名称：{self.product_name}
 - 分析日期：{get_today()}
 
 ## 已完成的分析：
-"""
+"""]
 
         # 添加各维度分析摘要
         for dim, result in context.items():
             if isinstance(result, dict):
-                context_str += f"\n### {dim}:\n"
-                context_str += self._format_analysis_summary(result)
+                parts.append(f"\n### {dim}:\n")
+                self._append_analysis_summary(result, 0, parts)
+
+        return "".join(parts)
 
-        # 组合prompt
-        full_prompt = f"""{expert['prompt']}
+    def _compose_expert_prompt(self, expert: Dict[str, Any], context_str: str) -> str:
+        """
+        组合专家prompt与上下文
+        """
+        return f"""{expert['prompt']}
 
 {context_str}
 
 请基于上述框架对{self.product_name}进行分析。
 """
 
-        return full_prompt
-
     def _format_analysis_summary(self, analysis: Dict[str, Any], indent: int = 0) -> str:
         """
         格式化分析摘要
@@ -290,21 +449,26 @@ class AnalysisGenerator:
         Returns:
             格式化的字符串
         """
-        result = ""
+        parts = []
+        self._append_analysis_summary(analysis, indent, parts)
+        return "".join(parts)
+
+    def _append_analysis_summary(self, analysis: Dict[str, Any], indent: int, parts: List[str]) -> None:
+        """
+        将分析摘要逐行追加到 parts（递归共用同一个列表，最后一次 join）
+        """
         indent_str = "  " * indent
 
         for key, value in analysis.items():
             if isinstance(value, dict):
-                result += f"{indent_str}- {key}:\n"
-                result += self._format_analysis_summary(value, indent + 1)
+                parts.append(f"{indent_str}- {key}:\n")
+                self._append_analysis_summary(value, indent + 1, parts)
             elif isinstance(value, list):
-                result += f"{indent_str}- {key}:\n"
+                parts.append(f"{indent_str}- {key}:\n")
                 for item in value:
-                    result += f"{indent_str}  - {item}\n"
+                    parts.append(f"{indent_str}  - {item}\n")
             else:
-                result += f"{indent_str}- {key}: {value}\n"
-
-        return result
+                parts.append(f"{indent_str}- {key}: {value}\n")
 
     def generate_expert_insights_prompts(self) -> Dict[str, str]:
         """
@@ -316,12 +480,13 @@ class AnalysisGenerator:
         # 准备上下文（当前已完成的分析）
         context = self.analysis_results['dimensions']
 
-        # 专家召集顺序（从配置获取）
-        expert_order = ['yujun', 'liangning', 'andrew_chen', 'zengming', 'lishangyou']
+        # 上下文对所有专家相同，只构建一次
+        context_str = self._build_expert_context(context)
 
+        # 专家召集顺序即配置中的顺序
         prompts = {}
-        for expert_name in expert_order:
-            prompts[expert_name] = self.get_expert_prompt(expert_name, context)
+        for expert_name, expert in self._experts_in_order:
+            prompts[expert_name] = self._compose_expert_prompt(expert, context_str)
 
         return prompts
 
@@ -338,11 +503,12 @@ class AnalysisGenerator:
         # 选择模板
         template = self.get_template()
 
-        # 准备变量
+        # 准备变量；未提供的模块占位使用按配置预先算好的默认值
         variables = {
             'product_name': self.product_name,
             'analysis_date': get_today(),
             'analysis_modules': self._format_modules_label(self.get_required_dimensions()),
+            **self._dimension_placeholder_defaults(),
         }
 
         # 添加各维度分析
@@ -351,12 +517,6 @@ class AnalysisGenerator:
             variables[f'{dim}_name'] = dim_config['name_cn']
             variables[f'{dim}_content'] = self._format_dimension_content(analysis)
 
-        # 补齐未提供的模块占位
-        for dim in self.mode_config['dimensions']:
-            dim_config = self.get_dimension_config(dim)
-            variables.setdefault(f'{dim}_name', dim_config['name_cn'])
-            variables.setdefault(f'{dim}_content', "")
-
         # 添加专家洞察（如提供）
         if expert_insights:
             for expert_name, insight in expert_insights.items():
@@ -364,9 +524,7 @@ class AnalysisGenerator:
                 variables[f'{expert_name}_name'] = expert['name']
                 variables[f'{expert_name}_content'] = insight
         else:
-            for expert_name, expert in self.expert_prompts.get('experts', {}).items():
-                variables.setdefault(f'{expert_name}_name', expert.get('name', expert_name))
-                variables.setdefault(f'{expert_name}_content', "")
+            variables.update(self._expert_placeholder_defaults())
 
         # 填充模板
         document = fill_template(template, variables)
@@ -383,20 +541,20 @@ class AnalysisGenerator:
         Returns:
             Markdown格式的内容
         """
-        content = ""
+        parts = []
 
         for key, value in analysis.items():
             if isinstance(value, dict):
-                content += f"\n### {key}\n\n"
-                content += self._format_analysis_summary(value)
+                parts.append(f"\n### {key}\n\n")
+                self._append_analysis_summary(value, 0, parts)
             elif isinstance(value, list):
-                content += f"\n### {key}\n\n"
+                parts.append(f"\n### {key}\n\n")
                 for item in value:
-                    content += f"- {item}\n"
+                    parts.append(f"- {item}\n")
             else:
-                content += f"\n**{key}**: {value}\n\n"
+                parts.append(f"\n**{key}**: {value}\n\n")
 
-        return content
+        return "".join(parts)
 
     def _get_builtin_template(self) -> str:
         """
@@ -405,73 +563,7 @@ class AnalysisGenerator:
         Returns:
             模板字符串
         """
-        return """# {product_name} 产品分析
-
-> **分析日期**: {analysis_date}
-> **分析模块**: {analysis_modules}
-
-## 一句话总结
-
-[待填充]
-
-## Part G: {G_name}
-
-{G_content}
-
-## Part O: {O_name}
-
-{O_content}
-
-## Part S: {S_name}
-
-{S_content}
-
-## Part C: {C_name}
-
-{C_content}
-
-## Part P: {P_name}
-
-{P_content}
-
-## Part E: {E_name}
-
-{E_content}
-
-## Part L: {L_name}
-
-### 俞军视角: {yujun_name}
-
-{yujun_content}
-
-### 梁宁视角: {liangning_name}
-
-{liangning_content}
-
-### Andrew Chen视角: {andrew_chen_name}
-
-{andrew_chen_content}
-
-### 曾鸣视角: {zengming_name}
-
-{zengming_content}
-
-### 李善友视角: {lishangyou_name}
-
-{lishangyou_content}
-
-### 综合洞察
-
-[待填充]
-
-## 可复用模式识别
-
-[待填充]
-
-## 数据来源
-
-[待填充]
-"""
+        return _BUILTIN_TEMPLATE
 
     def save_analysis(self, document_content: str, document_number: Optional[int] = None) -> Path:
         """
@@ -579,14 +671,18 @@ def main():
     args = parser.parse_args()
     modules = []
     if args.modules:
-        import re
-        modules = [m.strip() for m in re.split(r'[，,、]', args.modules) if m.strip()]
+        modules = [m.strip() for m in _MODULE_SPLIT_RE.split(args.modules) if m.strip()]
 
     if args.framework:
         # 显示分析框架
         framework = create_analysis_framework(args.product, modules=modules or None)
         print(f"\n=== {args.product} 分析框架 ===\n")
-        print(json.dumps(framework, ensure_ascii=False, indent=2))
+        if HAS_ORJSON:
+            # 直接写字节前先刷新已 print 的标题，保证输出顺序
+            sys.stdout.flush()
+            sys.stdout.buffer.write(orjson.dumps(framework, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS) + b"\n")
+        else:
+            print(json.dumps(framework, ensure_ascii=False, indent=2))
 
     elif args.prompts:
         # 生成专家prompts
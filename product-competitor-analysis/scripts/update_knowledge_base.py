@@ -12,12 +12,13 @@ Created: 2025-12-19
 
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Union
 
 # 导入utils
 from utils import (
     read_file,
     write_file,
+    write_chunks,
     file_exists,
     ensure_directory_exists,
     get_today,
@@ -28,6 +29,17 @@ from utils import (
 )
 
 
+# 模式库文档结构的正则，模块加载时编译一次
+_RE_PATTERN_LIST = re.compile(r'(## 模式列表\n\n)(.*?)(---\n\n## 更新记录)', re.DOTALL)
+_RE_HEADING_COUNT = re.compile(r'^### ', re.MULTILINE)
+# 模式数量 / 更新时间两个元数据字段，group(2) / group(4) 为字段值
+_RE_META_FIELDS = re.compile(
+    r'(>\s*\*\*模式数量\*\*:\s*)(\d+)|(>\s*\*\*更新时间\*\*:\s*)(\d{4}-\d{2}-\d{2})'
+)
+_RE_LOG_HEADER = re.compile(r'(## 更新记录\n\n)')
+_RE_HEADING_NAME = re.compile(r'^###?\s+(.+?)\s*$', re.MULTILINE)
+
+
 # ==================== 模式库更新 ====================
 
 class PatternLibraryUpdater:
@@ -56,7 +68,98 @@ class PatternLibraryUpdater:
         if not file_exists(self.file_path):
             self._create_initial_file()
 
-        self.content = read_file(self.file_path)
+        self._load(read_file(self.file_path))
+
+        # 在 with 块内（或批量添加时）推迟写文件，退出时统一保存
+        self._deferred = False
+        self._dirty = False
+
+    def __enter__(self) -> 'PatternLibraryUpdater':
+        self._deferred = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._deferred = False
+        # 已添加的模式照常保存，与逐个添加时的效果一致
+        if self._dirty:
+            self.save()
+
+    def _load(self, content: str) -> None:
+        """
+        把文档切分为固定文本段和待插入的列表，新增内容只追加到列表，保存时按顺序逐段写出
+
+        文档被视为: 插入点之前 + [新模式条目] + 中间 + [新更新记录] + 其余，
+        找不到标准结构时模式条目追加到文件末尾；更新记录插入点可能在模式插入点之前
+        """
+        match = _RE_PATTERN_LIST.search(content)
+        if match:
+            # 插入到模式列表部分的末尾
+            insert_pos = match.end(1) + len(match.group(2))
+            self._entry_prefix = ""
+        else:
+            # 如果找不到标准结构，追加到文件末尾
+            insert_pos = len(content)
+            self._entry_prefix = "\n"
+
+        log_match = _RE_LOG_HEADER.search(content)
+        log_pos = log_match.end() if log_match else None
+        self._has_log = log_pos is not None
+
+        # 按位置排好的固定文本段，以及两个插入点分别对应的列表
+        self._entries: List[str] = []
+        self._log_lines: List[str] = []
+        if log_pos is None:
+            self._parts = [content[:insert_pos], self._entries, content[insert_pos:]]
+        elif log_pos <= insert_pos:
+            self._parts = [content[:log_pos], self._log_lines, content[log_pos:insert_pos],
+                           self._entries, content[insert_pos:]]
+        else:
+            self._parts = [content[:insert_pos], self._entries, content[insert_pos:log_pos],
+                           self._log_lines, content[log_pos:]]
+
+        # 固定文本段中的元数据值换成占位，保存时直接填入，不再对全文做正则替换
+        self._parts = [
+            part if isinstance(part, list) else self._split_meta_fields(part)
+            for part in self._parts
+        ]
+
+        self._count = len(_RE_HEADING_COUNT.findall(content))
+        # 文档中已有的标题名称，判重时直接查集合
+        self._names = set(_RE_HEADING_NAME.findall(content))
+
+    @staticmethod
+    def _split_meta_fields(text: str) -> tuple:
+        """把文本切成片段，元数据值替换为 (字段, 原值) 占位"""
+        pieces = []
+        pos = 0
+        for match in _RE_META_FIELDS.finditer(text):
+            if match.group(2) is not None:
+                field, value_group = 'count', 2
+            else:
+                field, value_group = 'updated', 4
+            pieces.append(text[pos:match.start(value_group)])
+            pieces.append((field, match.group(value_group)))
+            pos = match.end(value_group)
+        pieces.append(text[pos:])
+        return tuple(pieces)
+
+    def _iter_chunks(self, today: str) -> Iterator[str]:
+        """按顺序产出文档各段（模式数量、更新时间在此时写入元数据）"""
+        values = {'count': str(self._count), 'updated': today}
+        for part in self._parts:
+            if part is self._entries:
+                yield from part
+            elif part is self._log_lines:
+                # 新记录插在更新记录顶部，越晚添加越靠前
+                yield from reversed(part)
+            else:
+                for piece in part:
+                    if isinstance(piece, tuple):
+                        field, original = piece
+                        # 没有新增模式时元数据保持原样
+                        yield values[field] if self._entries else original
+                    else:
+                        yield piece
 
     def _create_initial_file(self) -> None:
         """创建初始模式库文件"""
@@ -70,10 +173,11 @@ class PatternLibraryUpdater:
             title = "81.92 技术壁垒分析"
             description = "记录各产品的技术护城河、核心竞争力等"
 
+        today = get_today()
         initial_content = f"""# {title}
 
 > **说明**: {description}
-> **更新时间**: {get_today()}
+> **更新时间**: {today}
 > **模式数量**: 0
 
 ## 模式列表
@@ -82,11 +186,11 @@ class PatternLibraryUpdater:
 
 ## 更新记录
 
-- {get_today()}: 初始化文档
+- {today}: 初始化文档
 """
         write_file(self.file_path, initial_content)
 
-    def add_pattern(self, pattern_data: Dict[str, Any]) -> bool:
+    def add_pattern(self, pattern_data: Dict[str, Any], today: Optional[str] = None) -> bool:
         """
         添加新模式
 
@@ -97,6 +201,7 @@ class PatternLibraryUpdater:
                 - source_product: 来源产品
                 - example: 示例
                 - applicability: 适用场景
+            today: 记录用的日期，默认取当天（批量添加时由调用方统一传入）
 
         Returns:
             是否成功添加（如果已存在则返回False）
@@ -105,27 +210,50 @@ class PatternLibraryUpdater:
         if self._pattern_exists(pattern_data['name']):
             return False
 
+        today = today or get_today()
+
         # 构建模式条目
         pattern_entry = self._format_pattern_entry(pattern_data)
 
         # 插入到模式列表
         self._insert_pattern(pattern_entry)
 
-        # 更新模式数量
-        self._update_pattern_count()
-
         # 添加更新记录
-        self._add_update_log(f"新增模式: {pattern_data['name']} (来自 {pattern_data['source_product']})")
+        self._add_update_log(f"新增模式: {pattern_data['name']} (来自 {pattern_data['source_product']})", today)
 
         # 保存
-        write_file(self.file_path, self.content)
+        if self._deferred:
+            self._dirty = True
+        else:
+            self.save(today)
 
         return True
 
+    def add_patterns(self, patterns: Iterable[Dict[str, Any]]) -> List[bool]:
+        """
+        批量添加模式，只读写一次文件
+
+        Args:
+            patterns: 模式数据列表，格式同 add_pattern
+
+        Returns:
+            每个模式是否成功添加
+        """
+        today = get_today()
+        if self._deferred:
+            return [self.add_pattern(data, today) for data in patterns]
+
+        with self:
+            return [self.add_pattern(data, today) for data in patterns]
+
+    def save(self, today: Optional[str] = None) -> None:
+        """写回模式库文件（逐段写入，不再拼出一份完整文档）"""
+        write_chunks(self.file_path, self._iter_chunks(today or get_today()))
+        self._dirty = False
+
     def _pattern_exists(self, pattern_name: str) -> bool:
         """检查模式是否已存在"""
-        pattern = rf'###?\s+{re.escape(pattern_name)}'
-        return bool(re.search(pattern, self.content))
+        return pattern_name.strip() in self._names
 
     def _format_pattern_entry(self, data: Dict[str, Any]) -> str:
         """格式化模式条目"""
@@ -152,46 +280,17 @@ class PatternLibraryUpdater:
 
     def _insert_pattern(self, pattern_entry: str) -> None:
         """插入模式到文档"""
-        # 查找模式列表部分的结束位置
-        pattern = r'(## 模式列表\n\n)(.*?)(---\n\n## 更新记录)'
-        match = re.search(pattern, self.content, re.DOTALL)
+        entry = self._entry_prefix + pattern_entry
+        self._entries.append(entry)
+        # 新条目中的 ### 标题计入模式数量和已有名称
+        self._count += len(_RE_HEADING_COUNT.findall(entry))
+        self._names.update(_RE_HEADING_NAME.findall(entry))
 
-        if match:
-            # 插入到模式列表部分
-            insert_pos = match.end(1) + len(match.group(2))
-            self.content = self.content[:insert_pos] + pattern_entry + self.content[insert_pos:]
-        else:
-            # 如果找不到标准结构，追加到文件末尾
-            self.content += "\n" + pattern_entry
-
-    def _update_pattern_count(self) -> None:
-        """更新模式数量"""
-        # 统计模式数量（查找 ### 标题）
-        count = len(re.findall(r'^### ', self.content, re.MULTILINE))
-
-        # 更新元数据
-        self.content = re.sub(
-            r'(>\s*\*\*模式数量\*\*:\s*)\d+',
-            rf'\g<1>{count}',
-            self.content
-        )
-
-        # 更新更新时间
-        self.content = re.sub(
-            r'(>\s*\*\*更新时间\*\*:\s*)\d{4}-\d{2}-\d{2}',
-            rf'\g<1>{get_today()}',
-            self.content
-        )
-
-    def _add_update_log(self, message: str) -> None:
+    def _add_update_log(self, message: str, today: str) -> None:
         """添加更新记录"""
-        log_pattern = r'(## 更新记录\n\n)'
-        match = re.search(log_pattern, self.content)
-
-        if match:
-            log_entry = f"- {get_today()}: {message}\n"
-            insert_pos = match.end()
-            self.content = self.content[:insert_pos] + log_entry + self.content[insert_pos:]
+        # 文档中没有更新记录部分时不记录
+        if self._has_log:
+            self._log_lines.append(f"- {today}: {message}\n")
 
 
 # ==================== 分析模块库更新 ====================
@@ -199,15 +298,21 @@ class PatternLibraryUpdater:
 class AnalysisModuleUpdater:
     """分析模块库更新器"""
 
+    # 本进程内已确认维度目录齐全的模块库根目录，再次构造时跳过 mkdir
+    _dirs_verified: set = set()
+
     def __init__(self):
         """初始化分析模块库更新器"""
         self.base_dir = KB_ANALYSIS_MODULES
-        ensure_directory_exists(self.base_dir)
+        self.dimensions = ['增长飞轮', 'Aha Moment', '商业化策略', '数据飞轮', '用户价值', '产品定位']
+        self._dim_paths = {dim: self.base_dir / dim for dim in self.dimensions}
 
         # 确保各个维度目录存在
-        self.dimensions = ['增长飞轮', 'Aha Moment', '商业化策略', '数据飞轮', '用户价值', '产品定位']
-        for dim in self.dimensions:
-            ensure_directory_exists(self.base_dir / dim)
+        if self.base_dir not in AnalysisModuleUpdater._dirs_verified:
+            ensure_directory_exists(self.base_dir)
+            for dim_path in self._dim_paths.values():
+                ensure_directory_exists(dim_path)
+            AnalysisModuleUpdater._dirs_verified.add(self.base_dir)
 
     def save_module(self, dimension: str, product_name: str, content: str) -> Path:
         """
@@ -221,12 +326,13 @@ class AnalysisModuleUpdater:
         Returns:
             保存的文件路径
         """
-        if dimension not in self.dimensions:
+        dim_path = self._dim_paths.get(dimension)
+        if dim_path is None:
             raise ValueError(f"未知维度: {dimension}，支持的维度: {self.dimensions}")
 
         # 构建文件名
         filename = f"{product_name}_{dimension}.md"
-        file_path = self.base_dir / dimension / filename
+        file_path = dim_path / filename
 
         # 添加元数据
         full_content = f"""# {product_name} - {dimension}分析
@@ -250,67 +356,67 @@ class AnalysisModuleUpdater:
 
 
 # ==================== 辅助函数 ====================
-def add_growth_pattern(pattern_data: Dict[str, Any]) -> bool:
+def _add_to_library(
+    library_type: str,
+    label: str,
+    data: Union[Dict[str, Any], Iterable[Dict[str, Any]]],
+) -> Union[bool, List[bool]]:
+    """向指定模式库添加一个或一批模式，并打印结果"""
+    updater = PatternLibraryUpdater(library_type)
+
+    if isinstance(data, dict):
+        items = [data]
+        results = [updater.add_pattern(data)]
+    else:
+        items = list(data)
+        results = updater.add_patterns(items)
+
+    for item, success in zip(items, results):
+        if success:
+            print(f"✅ 已添加{label}: {item['name']}")
+        else:
+            print(f"⚠️ {label}已存在: {item['name']}")
+
+    return results[0] if isinstance(data, dict) else results
+
+
+def add_growth_pattern(pattern_data: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> Union[bool, List[bool]]:
     """
     添加增长模式
 
     Args:
-        pattern_data: 模式数据
+        pattern_data: 模式数据，或模式数据列表（批量添加）
 
     Returns:
-        是否成功添加
+        是否成功添加（批量时为每个模式的结果列表）
     """
-    updater = PatternLibraryUpdater('growth')
-    success = updater.add_pattern(pattern_data)
-
-    if success:
-        print(f"✅ 已添加增长模式: {pattern_data['name']}")
-    else:
-        print(f"⚠️ 增长模式已存在: {pattern_data['name']}")
-
-    return success
+    return _add_to_library('growth', '增长模式', pattern_data)
 
 
-def add_business_model(model_data: Dict[str, Any]) -> bool:
+def add_business_model(model_data: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> Union[bool, List[bool]]:
     """
     添加商业模式
 
     Args:
-        model_data: 模式数据
+        model_data: 模式数据，或模式数据列表（批量添加）
 
     Returns:
-        是否成功添加
+        是否成功添加（批量时为每个模式的结果列表）
     """
-    updater = PatternLibraryUpdater('business')
-    success = updater.add_pattern(model_data)
-
-    if success:
-        print(f"✅ 已添加商业模式: {model_data['name']}")
-    else:
-        print(f"⚠️ 商业模式已存在: {model_data['name']}")
-
-    return success
+    return _add_to_library('business', '商业模式', model_data)
 
 
-def add_tech_moat(moat_data: Dict[str, Any]) -> bool:
+def add_tech_moat(moat_data: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> Union[bool, List[bool]]:
     """
     添加技术壁垒
 
     Args:
-        moat_data: 模式数据
+        moat_data: 模式数据，或模式数据列表（批量添加）
 
     Returns:
-        是否成功添加
+        是否成功添加（批量时为每个模式的结果列表）
     """
-    updater = PatternLibraryUpdater('tech')
-    success = updater.add_pattern(moat_data)
-
-    if success:
-        print(f"✅ 已添加技术壁垒: {moat_data['name']}")
-    else:
-        print(f"⚠️ 技术壁垒已存在: {moat_data['name']}")
-
-    return success
+    return _add_to_library('tech', '技术壁垒', moat_data)
 
 
 def save_analysis_module(dimension: str, product_name: str, content: str) -> Path:
@@ -346,7 +452,7 @@ def main():
     # 模式库更新命令
     pattern_parser = subparsers.add_parser('pattern', help='添加模式')
     pattern_parser.add_argument('--type', required=True, choices=['growth', 'business', 'tech'], help='模式类型')
-    pattern_parser.add_argument('--data', required=True, help='模式数据（JSON格式）')
+    pattern_parser.add_argument('--data', required=True, help='模式数据（JSON格式，传入数组时批量添加）')
 
     # 分析模块保存命令
     module_parser = subparsers.add_parser('module', help='保存分析模块')
@@ -357,7 +463,7 @@ def main():
     args = parser.parse_args()
 
     if args.command == 'pattern':
-        # 添加模式
+        # 添加模式（JSON 数组走批量路径，只读写一次文件）
         data = json.loads(args.data)
 
         if args.type == 'growth':
@@ -13,7 +13,7 @@ import json
 import yaml
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterable, List, Optional, Any, Union
 import glob as glob_module
 
 
@@ -74,6 +74,19 @@ def write_file(file_path: Union[str, Path], content: str, encoding: str = 'utf-8
         raise Exception(f"写入文件失败 {file_path}: {str(e)}")
 
 
+def write_chunks(file_path: Union[str, Path], chunks: Iterable[str], encoding: str = 'utf-8') -> None:
+    """逐段写入文件内容（大文档无需先拼接成完整字符串）"""
+    try:
+        file_path = Path(file_path)
+        # 确保目录存在
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(file_path, 'w', encoding=encoding) as f:
+            f.writelines(chunks)
+    except Exception as e:
+        raise Exception(f"写入文件失败 {file_path}: {str(e)}")
+
+
 def append_to_file(file_path: Union[str, Path], content: str, encoding: str = 'utf-8') -> None:
     """追加内容到文件末尾"""
     try:
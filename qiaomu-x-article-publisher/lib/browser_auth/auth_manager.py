@@ -3,13 +3,18 @@
 Browser Authentication Framework - 核心认证管理器
 """
 
+import atexit
 import json
-import time
+import os
 import re
+import shutil
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any
 
 from patchright.sync_api import sync_playwright, BrowserContext, Page
+from patchright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from .config import SiteConfig
 from .browser_factory import BrowserFactory
@@ -32,6 +37,31 @@ class BrowserAuthManager:
     - state.json: 手动注入 session cookies
     """
 
+    # 进程内共享的 Playwright 实例（启动 Node 驱动开销大，首次使用时启动，进程退出时停止）。
+    # Sync API 对象只能在创建它的线程中使用
+    _playwright = None
+    _playwright_lock = threading.Lock()
+
+    @classmethod
+    def _get_playwright(cls):
+        """获取共享的 Playwright 实例，必要时启动"""
+        with cls._playwright_lock:
+            if cls._playwright is None:
+                cls._playwright = sync_playwright().start()
+                atexit.register(cls._stop_playwright)
+            return cls._playwright
+
+    @classmethod
+    def _stop_playwright(cls):
+        """停止共享的 Playwright 实例"""
+        with cls._playwright_lock:
+            playwright, cls._playwright = cls._playwright, None
+        if playwright:
+            try:
+                playwright.stop()
+            except Exception:
+                pass
+
     def __init__(self, site_config: SiteConfig, state_dir: Path):
         """
         初始化认证管理器
@@ -96,7 +126,23 @@ class BrowserAuthManager:
 
         return info
 
-    def _check_success_indicators(self, page: Page) -> bool:
+    def _url_matches(self, url: str) -> bool:
+        """URL 是否满足 url_contains / url_pattern 指标"""
+        indicators = self.config.success_indicators
+
+        # URL 包含检查
+        if 'url_contains' in indicators:
+            if indicators['url_contains'] in url:
+                return True
+
+        # URL 正则匹配
+        if 'url_pattern' in indicators:
+            if re.match(indicators['url_pattern'], url):
+                return True
+
+        return False
+
+    def _check_success_indicators(self, page: Page, element_timeout_ms: int = 5000) -> bool:
         """
         根据 success_indicators 配置检查登录是否成功
 
@@ -108,35 +154,29 @@ class BrowserAuthManager:
 
         Args:
             page: Playwright Page 实例
+            element_timeout_ms: DOM 元素检查的最长等待时间（轮询时用较短值）
 
         Returns:
             True 如果验证成功
         """
         indicators = self.config.success_indicators
 
-        # 1. URL 包含检查
-        if 'url_contains' in indicators:
-            if indicators['url_contains'] in page.url:
-                return True
-
-        # 2. URL 正则匹配
-        if 'url_pattern' in indicators:
-            if re.match(indicators['url_pattern'], page.url):
-                return True
+        # 1-2. URL 包含 / 正则匹配
+        if self._url_matches(page.url):
+            return True
 
         # 3. Cookie 存在性检查
         if 'cookie_exists' in indicators:
-            cookies = page.context.cookies()
-            cookie_names = [c['name'] for c in cookies]
-            if indicators['cookie_exists'] in cookie_names:
+            target = indicators['cookie_exists']
+            # 检查整个上下文的 cookies：登录可能停在 SSO 等其他域名，目标站点的 cookie 仍应算数
+            if any(c['name'] == target for c in page.context.cookies()):
                 return True
 
         # 4. DOM 元素存在性检查
         if 'element_exists' in indicators:
             try:
                 selector = indicators['element_exists']
-                # 等待最多 5 秒
-                element = page.wait_for_selector(selector, timeout=5000)
+                element = page.wait_for_selector(selector, timeout=element_timeout_ms)
                 if element:
                     return True
             except Exception:
@@ -151,6 +191,25 @@ class BrowserAuthManager:
 
         return False
 
+    def _wait_for_login_event(self, page: Page, timeout_ms: float) -> None:
+        """
+        等待可能代表登录成功的页面事件，事件发生即返回，超时不抛异常
+
+        - 配置了 URL 指标：等待 URL 跳转到匹配的地址
+        - 否则配置了 DOM 指标：等待元素出现
+        - 仅有 Cookie / 自定义验证：无事件可等，退化为定时轮询
+        """
+        indicators = self.config.success_indicators
+        try:
+            if 'url_contains' in indicators or 'url_pattern' in indicators:
+                page.wait_for_url(self._url_matches, wait_until="commit", timeout=timeout_ms)
+            elif 'element_exists' in indicators:
+                page.wait_for_selector(indicators['element_exists'], timeout=timeout_ms)
+            else:
+                time.sleep(timeout_ms / 1000)
+        except PlaywrightTimeoutError:
+            pass
+
     def setup_auth(self, headless: bool = False) -> bool:
         """
         交互式登录设置
@@ -171,11 +230,12 @@ class BrowserAuthManager:
         print(f"🔐 Starting authentication setup for {self.config.site_name}...")
         print(f"  Timeout: {self.config.login_timeout_minutes} minutes")
 
-        playwright = None
+        self._sweep_stale_profile_dirs()
+
         context = None
 
         try:
-            playwright = sync_playwright().start()
+            playwright = self._get_playwright()
 
             # 启动 persistent context
             context = BrowserFactory.launch_persistent_context(
@@ -199,18 +259,34 @@ class BrowserAuthManager:
             print(f"\n  ⏳ Please log in to {self.config.site_name}...")
             print(f"  ⏱️  Waiting up to {self.config.login_timeout_minutes} minutes for login...")
 
-            # 轮询检查登录状态
+            # 等待登录状态变化
             timeout_seconds = self.config.login_timeout_minutes * 60
             start_time = time.time()
 
-            while time.time() - start_time < timeout_seconds:
-                if self._check_success_indicators(page):
+            # 只有一种可等待的事件（URL 或 DOM）时整段时间都交给事件等待；
+            # 还需检查 Cookie / 自定义验证或同时配置了 URL 和 DOM 时，每 2 秒复查一次全部指标
+            indicators = self.config.success_indicators
+            has_url = 'url_contains' in indicators or 'url_pattern' in indicators
+            has_element = 'element_exists' in indicators
+            needs_polling = (
+                'cookie_exists' in indicators
+                or self.config.custom_validator is not None
+                or (has_url and has_element)
+            )
+
+            while True:
+                if self._check_success_indicators(page, element_timeout_ms=500):
                     print(f"  ✅ Login successful!")
                     self._save_browser_state(context)
                     self._save_auth_info()
                     return True
 
-                time.sleep(2)  # 每 2 秒检查一次
+                remaining = timeout_seconds - (time.time() - start_time)
+                if remaining <= 0:
+                    break
+
+                wait_seconds = min(remaining, 2) if needs_polling else remaining
+                self._wait_for_login_event(page, wait_seconds * 1000)
 
             print(f"  ❌ Authentication timeout")
             return False
@@ -225,11 +301,6 @@ class BrowserAuthManager:
                     context.close()
                 except Exception:
                     pass
-            if playwright:
-                try:
-                    playwright.stop()
-                except Exception:
-                    pass
 
     def _save_browser_state(self, context: BrowserContext):
         """保存浏览器状态到 state.json"""
@@ -264,11 +335,10 @@ class BrowserAuthManager:
 
         print(f"🔍 Validating authentication for {self.config.site_name}...")
 
-        playwright = None
         context = None
 
         try:
-            playwright = sync_playwright().start()
+            playwright = self._get_playwright()
 
             # 启动 persistent context + 注入 cookies
             context = BrowserFactory.launch_persistent_context(
@@ -302,11 +372,6 @@ class BrowserAuthManager:
                     context.close()
                 except Exception:
                     pass
-            if playwright:
-                try:
-                    playwright.stop()
-                except Exception:
-                    pass
 
     def get_authenticated_context(self) -> BrowserContext:
         """
@@ -330,7 +395,7 @@ class BrowserAuthManager:
                 f"Please run setup_auth() first."
             )
 
-        playwright = sync_playwright().start()
+        playwright = self._get_playwright()
 
         context = BrowserFactory.launch_persistent_context(
             playwright,
@@ -341,6 +406,51 @@ class BrowserAuthManager:
 
         return context
 
+    @staticmethod
+    def _delete_in_background(path: Path):
+        """在后台线程删除目录（非守护线程：进程正常退出前会等删除完成）"""
+        threading.Thread(
+            target=shutil.rmtree,
+            args=(path,),
+            kwargs={'ignore_errors': True},
+            name="clear-browser-profile",
+        ).start()
+
+    def _remove_profile_dir(self) -> bool:
+        """
+        删除 browser profile 目录
+
+        Chrome profile 含大量缓存小文件，逐个删除较慢：先把目录改名移开（原子操作，
+        原路径立即可用，reauth 可以马上启动新浏览器），再在后台线程删除改名后的目录
+
+        Returns:
+            True 如果目录已移开、正在后台删除；False 如果已就地同步删除
+        """
+        trash_dir = self.profile_dir.with_name(
+            f".{self.profile_dir.name}.deleting-{os.getpid()}-{time.time_ns()}"
+        )
+        try:
+            self.profile_dir.rename(trash_dir)
+        except OSError:
+            # 无法改名（如目录被占用）时就地同步删除
+            shutil.rmtree(self.profile_dir)
+            return False
+
+        self._delete_in_background(trash_dir)
+        return True
+
+    def _sweep_stale_profile_dirs(self):
+        """
+        清理以前遗留的 .<profile>.deleting-* 目录
+
+        后台删除期间进程被杀死时，改名移开的目录会留在磁盘上；本进程自己正在删除的目录跳过
+        """
+        own_prefix = f".{self.profile_dir.name}.deleting-{os.getpid()}-"
+        for stale_dir in self.profile_dir.parent.glob(f".{self.profile_dir.name}.deleting-*"):
+            if stale_dir.name.startswith(own_prefix) or not stale_dir.is_dir():
+                continue
+            self._delete_in_background(stale_dir)
+
     def clear_auth(self):
         """
         清除所有认证数据
@@ -352,6 +462,8 @@ class BrowserAuthManager:
         """
         print(f"🧹 Clearing authentication data for {self.config.site_name}...")
 
+        self._sweep_stale_profile_dirs()
+
         # 删除 state.json
         if self.state_file.exists():
             self.state_file.unlink()
@@ -359,9 +471,10 @@ class BrowserAuthManager:
 
         # 删除 browser profile 目录
         if self.profile_dir.exists():
-            import shutil
-            shutil.rmtree(self.profile_dir)
-            print(f"  ✓ Removed {self.profile_dir}")
+            if self._remove_profile_dir():
+                print(f"  ✓ Moved {self.profile_dir} aside for deletion")
+            else:
+                print(f"  ✓ Removed {self.profile_dir}")
 
         # 删除 auth_info.json
         if self.auth_info_file.exists():
@@ -10,6 +10,13 @@ from typing import Optional
 
 from patchright.sync_api import Playwright, BrowserContext
 
+# 可选：orjson（C 实现，解析更快），未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from .config import DEFAULT_BROWSER_ARGS, DEFAULT_USER_AGENT
 
 
@@ -79,13 +86,20 @@ class BrowserFactory:
         这是解决 Playwright #36139 bug 的关键步骤：
         - Persistent cookies 会自动保存到 user_data_dir
         - Session cookies 必须手动注入
+
+        因此只注入 session cookies（expires == -1），不重复注入 profile 中已有的 cookies
         """
         try:
-            with open(state_file, 'r') as f:
-                state = json.load(f)
-                if 'cookies' in state and len(state['cookies']) > 0:
-                    context.add_cookies(state['cookies'])
-                    # print(f"  🔧 注入 {len(state['cookies'])} cookies")
+            if HAS_ORJSON:
+                state = orjson.loads(state_file.read_bytes())
+            else:
+                with open(state_file, 'r') as f:
+                    state = json.load(f)
+
+            session_cookies = [c for c in state.get('cookies', ()) if c.get('expires', 0) == -1]
+            if session_cookies:
+                context.add_cookies(session_cookies)
+                # print(f"  🔧 注入 {len(session_cookies)} session cookies")
         except Exception as e:
             # 非致命错误，首次 setup 时 state.json 不存在
             pass